@@ -0,0 +1,27 @@
+"""Fake `claude` / `codex` CLI for benchmarks.
+
+Sleeps FAKE_AGENT_STARTUP seconds (simulated start-up), then prints
+FAKE_AGENT_OUTPUT_BYTES bytes of text and exits 0.
+"""
+
+import os
+import sys
+import time
+
+WORDS = "the selective method matches full processing on accuracy while running faster ".split()
+
+
+def main():
+    time.sleep(float(os.environ.get("FAKE_AGENT_STARTUP", "0")))
+    size = int(os.environ.get("FAKE_AGENT_OUTPUT_BYTES", "2000"))
+    out, n, i = [], 0, 0
+    while n < size:
+        word = WORDS[i % len(WORDS)]
+        out.append(word)
+        n += len(word) + 1
+        i += 1
+    sys.stdout.write(" ".join(out)[:size] + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""SPACER offline benchmarks.
+
+Runs entirely against local stubs: a stub Semantic Scholar / CrossRef /
+arXiv server (benchmarks/stubs.py) and fake `claude` / `codex` executables
+(benchmarks/fake_agent.py). Results are written as JSON so two runs can be
+compared:
+
+    python benchmarks/run.py --sizes 1000,10000 --latency 0.002
+    python benchmarks/run.py --compare old.json new.json
+
+Every benchmark reports a primary `value` (lower is better) plus details.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from stubs import StubServer
+
+HERE = Path(__file__).resolve().parent
+SPACER_MAIN = "from spacer.cli import cli; cli()"
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "n": len(samples),
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "max": samples[-1],
+    }
+
+
+def run_measured(cmd, env=None, cwd=None):
+    """Run a command; return (seconds, returncode, stdout, peak RSS in KB)."""
+    with tempfile.TemporaryFile() as out:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=out, stderr=subprocess.STDOUT, env=env, cwd=cwd)
+        _, status, rusage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+        proc.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        out.seek(0)
+        return elapsed, proc.returncode, out.read().decode(errors="replace"), rusage.ru_maxrss
+
+
+def write_bib(path, n):
+    with open(path, "w") as f:
+        for i in range(n):
+            f.write(
+                f"@article{{key{i},\n"
+                f"  title = {{Synthetic Paper Number {i} on Selective Evidence}},\n"
+                f"  author = {{Lovelace, Ada}},\n  year = {{2021}},\n}}\n\n"
+            )
+
+
+def make_fake_agents(bin_dir):
+    """Create `claude` and `codex` shims that run fake_agent.py."""
+    for name in ("claude", "codex"):
+        shim = Path(bin_dir) / name
+        shim.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{HERE / "fake_agent.py"}" "$@"\n')
+        shim.chmod(0o755)
+
+
+def bench_verify(args, workdir):
+    results = {}
+    for n in args.sizes:
+        bib = Path(workdir) / f"synthetic-{n}.bib"
+        write_bib(bib, n)
+        with StubServer(args.latency, args.rate_429, args.seed) as stub:
+            env = dict(os.environ, **stub.env())
+            elapsed, code, out, rss = run_measured(
+                [sys.executable, "-c", SPACER_MAIN, "bib", "verify", str(bib)], env=env, cwd=workdir,
+            )
+            counters = stub.counters()
+        verified = out.count("✓")
+        results[f"bib_verify_{n}"] = {
+            "value": elapsed,
+            "unit": "s",
+            "entries": n,
+            "entries_per_s": n / elapsed if elapsed else None,
+            "verified": verified,
+            "returncode": code,
+            "peak_rss_kb": rss,
+            **counters,
+        }
+        print(f"  bib verify {n}: {elapsed:.2f}s ({n / elapsed:.0f} entries/s, "
+              f"{counters['throttled']} throttled)")
+    return results
+
+
+CHAT_SNIPPET = """
+import json, sys, time
+from spacer.llm import brain
+from spacer.chat import SYSTEM_PROMPT_FILE
+system = SYSTEM_PROMPT_FILE.read_text()
+messages, samples = [], []
+for i in range(int(sys.argv[1])):
+    messages.append({"role": "user", "content": f"Turn {i}: who are the readers of this paper?"})
+    start = time.perf_counter()
+    reply = brain(system, messages)
+    samples.append(time.perf_counter() - start)
+    messages.append({"role": "assistant", "content": reply})
+print(json.dumps(samples))
+"""
+
+
+def bench_chat(args, workdir):
+    home = Path(workdir) / "home"
+    (home / ".config" / "spacer").mkdir(parents=True, exist_ok=True)
+    bin_dir = Path(workdir) / "bin"
+    bin_dir.mkdir(exist_ok=True)
+    make_fake_agents(bin_dir)
+    results = {}
+    for backend in ("claude", "codex"):
+        (home / ".config" / "spacer" / "auth.json").write_text(json.dumps({"backend": backend}))
+        env = dict(
+            os.environ,
+            HOME=str(home),
+            PATH=f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+            FAKE_AGENT_STARTUP=str(args.agent_startup),
+            FAKE_AGENT_OUTPUT_BYTES=str(args.agent_output),
+        )
+        _, code, out, _ = run_measured(
+            [sys.executable, "-c", CHAT_SNIPPET, str(args.turns)], env=env, cwd=workdir,
+        )
+        if code != 0:
+            raise RuntimeError(f"chat benchmark failed:\n{out}")
+        stats = summarize(json.loads(out.strip().splitlines()[-1]))
+        # Overhead beyond the simulated agent start-up is what SPACER controls.
+        stats["overhead_p50"] = stats["p50"] - args.agent_startup
+        results[f"chat_turn_{backend}"] = {"value": stats["p50"], "unit": "s", **stats}
+        print(f"  chat turn ({backend}): p50 {stats['p50'] * 1000:.0f} ms, "
+              f"overhead {stats['overhead_p50'] * 1000:.0f} ms")
+    return results
+
+
+def bench_startup(args, workdir):
+    samples, rss = [], []
+    for _ in range(args.repeat):
+        elapsed, code, out, peak = run_measured([sys.executable, "-c", SPACER_MAIN, "--help"], cwd=workdir)
+        if code != 0:
+            raise RuntimeError(f"spacer --help failed:\n{out}")
+        samples.append(elapsed)
+        rss.append(peak)
+    stats = summarize(samples)
+    print(f"  cli start-up: p50 {stats['p50'] * 1000:.0f} ms, peak RSS {max(rss) / 1024:.1f} MB")
+    return {
+        "cli_startup": {"value": stats["p50"], "unit": "s", **stats},
+        "cli_memory": {"value": max(rss), "unit": "KB"},
+    }
+
+
+BENCHMARKS = {"verify": bench_verify, "chat": bench_chat, "startup": bench_startup}
+
+
+def compare(old_path, new_path, threshold):
+    old = json.loads(Path(old_path).read_text())["benchmarks"]
+    new = json.loads(Path(new_path).read_text())["benchmarks"]
+    regressions = 0
+    print(f"{'benchmark':<24} {'old':>12} {'new':>12} {'change':>9}")
+    for name in sorted(set(old) | set(new)):
+        if name not in old or name not in new:
+            print(f"{name:<24} {'(only in ' + ('new' if name in new else 'old') + ')':>35}")
+            continue
+        a, b = old[name]["value"], new[name]["value"]
+        change = (b - a) / a if a else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  ✗ regression"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  ✓ faster"
+        unit = new[name].get("unit", "")
+        print(f"{name:<24} {a:>9.4g} {unit:<2} {b:>9.4g} {unit:<2} {change:>+8.1%}{flag}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="Comma-separated subset")
+    parser.add_argument("--sizes", default="1000", help="bib verify sizes, e.g. 1000,10000")
+    parser.add_argument("--latency", type=float, default=0.002, help="Stub API latency (s)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of stub requests answered 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--agent-startup", type=float, default=0.2, help="Fake agent start-up (s)")
+    parser.add_argument("--agent-output", type=int, default=2000, help="Fake agent output size (bytes)")
+    parser.add_argument("--turns", type=int, default=10, help="Chat turns to time")
+    parser.add_argument("--repeat", type=int, default=5, help="CLI start-up repetitions")
+    parser.add_argument("--out", default=None, help="Output JSON (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regression threshold for --compare")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+
+    args.sizes = [int(s) for s in args.sizes.split(",") if s]
+    selected = [b.strip() for b in args.only.split(",") if b.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="spacer-bench-") as workdir:
+        for name in selected:
+            print(f"{name}:")
+            results.update(BENCHMARKS[name](args, workdir))
+
+    params = {k: v for k, v in vars(args).items() if k not in ("compare", "out", "only", "threshold")}
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": params,
+        },
+        "benchmarks": results,
+    }
+    out = Path(args.out) if args.out else HERE / "results" / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nWrote {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Local stand-ins for Semantic Scholar, CrossRef and arXiv.
+
+One threaded HTTP server answers all three APIs with synthetic but
+well-formed responses. Every request waits `latency` seconds, and a
+`rate_429` fraction of requests (chosen by a seeded RNG) gets a 429 so the
+retry/backoff path in `bib._s2_get` is exercised.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+
+def _paper(i, title):
+    return {
+        "paperId": f"stub{i:08d}",
+        "title": title,
+        "authors": [{"name": "Ada Lovelace"}, {"name": "Alan Turing"}],
+        "year": 2020 + i % 5,
+        "venue": "Stub Conference",
+        "externalIds": {"DOI": f"10.0000/stub.{i}", "ArXiv": f"2401.{i % 100000:05d}"},
+        "citationCount": i % 1000,
+        "abstract": f"Abstract for {title}. " * 8,
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, ctype="application/json"):
+        data = body.encode() if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        with server.lock:
+            server.requests += 1
+            throttle = server.rng.random() < server.rate_429
+            if throttle:
+                server.throttled += 1
+            n = server.requests
+        if throttle:
+            self._send(429, json.dumps({"message": "Too Many Requests"}))
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.startswith("/s2/paper/search"):
+            q = query.get("query", [""])[0]
+            limit = int(query.get("limit", ["10"])[0])
+            data = [_paper(n * 100 + i, q if i == 0 else f"{q} (variant {i})") for i in range(limit)]
+            self._send(200, json.dumps({"total": limit, "data": data}))
+        elif url.path.startswith("/crossref/"):
+            doi = url.path[len("/crossref/"):]
+            msg = {
+                "title": [f"Paper {doi}"],
+                "author": [{"family": "Lovelace", "given": "Ada"}],
+                "published-print": {"date-parts": [[2021, 1, 1]]},
+                "container-title": ["Stub Journal"],
+            }
+            self._send(200, json.dumps({"message": msg}))
+        elif url.path.startswith("/arxiv"):
+            arxiv_id = query.get("id_list", [""])[0]
+            feed = (
+                '<feed xmlns="http://www.w3.org/2005/Atom"><entry>'
+                f"<title>Paper {escape(arxiv_id)}</title>"
+                "<author><name>Ada Lovelace</name></author>"
+                "<published>2024-01-01T00:00:00Z</published>"
+                "</entry></feed>"
+            )
+            self._send(200, feed, "application/atom+xml")
+        else:
+            self._send(404, json.dumps({"error": "not found"}))
+
+
+class StubServer:
+    """Run the stub APIs on a free local port in a background thread."""
+
+    def __init__(self, latency=0.0, rate_429=0.0, seed=0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.rate_429 = rate_429
+        self.httpd.rng = random.Random(seed)
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests = 0
+        self.httpd.throttled = 0
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def env(self):
+        """Environment variables that point spacer.bib at this server."""
+        return {
+            "SPACER_S2_API": f"{self.base}/s2",
+            "SPACER_CROSSREF_API": f"{self.base}/crossref",
+            "SPACER_ARXIV_API": f"{self.base}/arxiv",
+        }
+
+    def counters(self):
+        return {"requests": self.httpd.requests, "throttled": self.httpd.throttled}
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
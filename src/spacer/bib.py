@@ -1,24 +1,34 @@
+import os
 import re
 import time
 import click
 import requests
 import xml.etree.ElementTree as ET
 
-S2_SEARCH = "https://api.semanticscholar.org/graph/v1/paper/search"
-S2_PAPER = "https://api.semanticscholar.org/graph/v1/paper"
-CROSSREF = "https://api.crossref.org/works"
-ARXIV_API = "http://export.arxiv.org/api/query"
+from .related import cache_lookup, cached_lookup, remember_papers
+from .trace import span
+
+# Overridable so benchmarks and offline runs can point at local stubs.
+S2_API = os.environ.get("SPACER_S2_API", "https://api.semanticscholar.org/graph/v1")
+S2_SEARCH = f"{S2_API}/paper/search"
+S2_PAPER = f"{S2_API}/paper"
+CROSSREF = os.environ.get("SPACER_CROSSREF_API", "https://api.crossref.org/works")
+ARXIV_API = os.environ.get("SPACER_ARXIV_API", "http://export.arxiv.org/api/query")
 
 HEADERS = {"User-Agent": "spacer-cli/0.1"}
+SEARCH_TTL = 7 * 24 * 3600
 
-def _s2_get(url, params, timeout=15):
+def _s2_get(url, params, timeout=15, retries=3):
     """GET with retry on 429."""
-    for attempt in range(3):
-        r = requests.get(url, params=params, headers=HEADERS, timeout=timeout)
-        if r.status_code == 429:
+    for attempt in range(retries):
+        with span("http.s2", attempt=attempt) as s:
+            r = requests.get(url, params=params, headers=HEADERS, timeout=timeout)
+            s.set(status=r.status_code, bytes=len(r.content))
+        if r.status_code == 429 and attempt + 1 < retries:
             wait = 2 ** attempt
             click.echo(f"  (rate limited, retrying in {wait}s...)", err=True)
-            time.sleep(wait)
+            with span("http.backoff", wait=wait):
+                time.sleep(wait)
             continue
         r.raise_for_status()
         return r
@@ -26,7 +36,25 @@ def _s2_get(url, params, timeout=15):
     return r
 
 def _s2_fields():
-    return "title,authors,year,venue,externalIds,citationCount"
+    return "title,authors,year,venue,externalIds,citationCount,abstract"
+
+def _norm(text):
+    return " ".join(str(text).lower().split())
+
+def _s2_search(query, limit, fields=None, retries=3, refresh=False):
+    """Search S2, answering repeat queries from the local cache."""
+    key = f"{limit}:{_norm(query)}"
+    if fields is None and not refresh:
+        cached = cached_lookup("search", key, SEARCH_TTL)
+        if cached is not None:
+            return cached
+    r = _s2_get(S2_SEARCH, params={"query": query, "limit": limit, "fields": fields or _s2_fields()},
+                retries=retries)
+    data = r.json().get("data", [])
+    if fields is None:
+        remember_papers(data)
+        cache_lookup("search", key, data)
+    return data
 
 def _make_bibtex(paper, key=None):
     """Construct bibtex from Semantic Scholar paper dict."""
@@ -62,11 +90,10 @@ def bib_group():
 @bib_group.command("search")
 @click.argument("query")
 @click.option("--limit", default=10, help="Number of results")
-def search(query, limit):
+@click.option("--refresh", is_flag=True, help="Ignore cached results")
+def search(query, limit, refresh):
     """Search Semantic Scholar for papers."""
-    r = _s2_get(S2_SEARCH, params={"query": query, "limit": limit, "fields": _s2_fields()})
-    r.raise_for_status()
-    data = r.json().get("data", [])
+    data = _s2_search(query, limit, refresh=refresh)
     if not data:
         click.echo("No results found.")
         return
@@ -89,20 +116,42 @@ def search(query, limit):
 @click.option("--doi", default=None, help="Fetch by DOI")
 @click.option("--arxiv", default=None, help="Fetch by arXiv ID")
 @click.option("--title", default=None, help="Fetch by exact title search")
-def get(doi, arxiv, title):
+@click.option("--refresh", is_flag=True, help="Ignore the local cache")
+def get(doi, arxiv, title, refresh):
     """Fetch a bibtex entry."""
     if doi:
-        _get_by_doi(doi)
+        bib = fetch_bibtex("doi", doi, refresh)
     elif arxiv:
-        _get_by_arxiv(arxiv)
+        bib = fetch_bibtex("arxiv", arxiv, refresh)
     elif title:
-        _get_by_title(title)
+        bib = fetch_bibtex("title", title, refresh)
     else:
         click.echo("Provide --doi, --arxiv, or --title")
+        return
+    click.echo(bib or "No results found.")
+
+
+def fetch_bibtex(kind, value, refresh=False, retries=3):
+    """BibTeX for a DOI, arXiv ID or title; cached per project. None if not found.
+
+    `retries` applies to the Semantic Scholar title search only; CrossRef and
+    arXiv are single requests.
+    """
+    key = _norm(value)
+    if not refresh:
+        cached = cached_lookup(kind, key)
+        if cached is not None:
+            return cached
+    bib = _get_by_title(value, retries) if kind == "title" else _FETCHERS[kind](value)
+    if bib:
+        cache_lookup(kind, key, bib)
+    return bib
 
 
 def _get_by_doi(doi):
-    r = requests.get(f"{CROSSREF}/{doi}", headers=HEADERS, timeout=15)
+    with span("http.crossref") as s:
+        r = requests.get(f"{CROSSREF}/{doi}", headers=HEADERS, timeout=15)
+        s.set(status=r.status_code)
     r.raise_for_status()
     msg = r.json()["message"]
     authors = " and ".join(
@@ -125,18 +174,19 @@ def _get_by_doi(doi):
     bib += f"  journal = {{{venue}}},\n"
     bib += f"  doi = {{{doi}}},\n"
     bib += "}"
-    click.echo(bib)
+    return bib
 
 
 def _get_by_arxiv(arxiv_id):
-    r = requests.get(ARXIV_API, params={"id_list": arxiv_id}, headers=HEADERS, timeout=15)
+    with span("http.arxiv") as s:
+        r = requests.get(ARXIV_API, params={"id_list": arxiv_id}, headers=HEADERS, timeout=15)
+        s.set(status=r.status_code)
     r.raise_for_status()
     ns = {"a": "http://www.w3.org/2005/Atom"}
     root = ET.fromstring(r.text)
     entry = root.find("a:entry", ns)
     if entry is None:
-        click.echo("Not found.")
-        return
+        return None
     title = entry.findtext("a:title", "", ns).strip().replace("\n", " ")
     authors = " and ".join(a.findtext("a:name", "", ns) for a in entry.findall("a:author", ns))
     published = entry.findtext("a:published", "", ns)
@@ -151,17 +201,17 @@ def _get_by_arxiv(arxiv_id):
     bib += f"  eprint = {{{arxiv_id}}},\n"
     bib += f"  archivePrefix = {{arXiv}},\n"
     bib += "}"
-    click.echo(bib)
+    return bib
 
 
-def _get_by_title(title):
-    r = _s2_get(S2_SEARCH, params={"query": title, "limit": 1, "fields": _s2_fields()})
-    r.raise_for_status()
-    data = r.json().get("data", [])
+def _get_by_title(title, retries=3):
+    data = _s2_search(title, 1, retries=retries)
     if not data:
-        click.echo("No results found.")
-        return
-    click.echo(_make_bibtex(data[0]))
+        return None
+    return _make_bibtex(data[0])
+
+
+_FETCHERS = {"doi": _get_by_doi, "arxiv": _get_by_arxiv}
 
 
 @bib_group.command("verify")
@@ -0,0 +1,76 @@
+"""SPACER cache — project-local state under .spacer/ (checkpoints, indexes)."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+STATE_DIR = Path(".spacer")
+
+
+def state_path(*parts):
+    """Path inside the project's .spacer/ directory (parents are created)."""
+    path = STATE_DIR.joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def load_json(path, default=None):
+    """Read a JSON state file; missing or corrupt files return `default`."""
+    path = Path(path)
+    if not path.exists():
+        return default
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, data):
+    """Atomically write a JSON state file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write("\n")
+    tmp.replace(path)
+
+
+class FileHasher:
+    """Content hashes for project files, memoized on (size, mtime, inode).
+
+    Only files whose stat signature changed since the last call are read
+    again, so re-checking a large tree costs one stat() per file.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else state_path("hashes.json")
+        self.entries = load_json(self.path, {})
+        self.dirty = False
+
+    def digest(self, path):
+        """sha256 of a file's contents, or "missing" if it does not exist."""
+        key = str(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return "missing"
+        sig = [st.st_size, st.st_mtime_ns, st.st_ino]
+        cached = self.entries.get(key)
+        if cached and cached[0] == sig:
+            return cached[1]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        self.entries[key] = [sig, digest]
+        self.dirty = True
+        return digest
+
+    def save(self):
+        if self.dirty:
+            save_json(self.path, self.entries)
+            self.dirty = False
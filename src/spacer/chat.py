@@ -8,8 +8,13 @@ import click
 from prompt_toolkit import PromptSession
 
 from .auth import get_backend
-from .bib import _s2_fields, _s2_get
+from .bib import _s2_search, fetch_bibtex
+from .lint import check_response
 from .llm import brain, hands
+from .prefetch import Prefetcher
+from .refs import format_check, format_who, load_index
+from .search import format_hits, search
+from .trace import traced
 from .status import (
     advance_sub_step,
     format_phase_info,
@@ -24,6 +29,7 @@ SYSTEM_PROMPT_FILE = Path(__file__).resolve().parent / "prompts" / "system.md"
 MAX_SUPPLY_CHARS = 12000
 
 
+@traced("prompt.build")
 def _build_system_prompt(config_path):
     """Build system prompt from template + current state."""
     template = SYSTEM_PROMPT_FILE.read_text(encoding="utf-8")
@@ -47,6 +53,7 @@ def _build_system_prompt(config_path):
     return prompt
 
 
+@traced("transcript.write")
 def _save_transcript(history, phase):
     """Save conversation to markdown file."""
     ts = datetime.now().strftime("%Y%m%d-%H%M%S")
@@ -55,16 +62,22 @@ def _save_transcript(history, phase):
     out_path = out_dir / f"discussion-{ts}.md"
 
     lines = [f"# SPACER Discussion — {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"]
+    headers = {"user": "## You", "context": "## Context"}
     for role, text in history:
-        header = "## You" if role == "user" else "## SPACER"
+        header = headers.get(role, "## SPACER")
         lines.append(f"\n{header}\n{text}\n")
 
     out_path.write_text("\n".join(lines), encoding="utf-8")
     return out_path
 
 
-def _handle_slash(cmd_line, history, config_path):
-    """Handle slash commands. Returns (response_text, should_quit)."""
+def _handle_slash(cmd_line, history, config_path, pending=None):
+    """Handle slash commands. Returns (response_text, should_quit).
+
+    Commands that pull material into the conversation (/search) record it in
+    `history` as a context entry and queue it in `pending`; the chat loop
+    prepends it to the next message sent to the brain.
+    """
     parts = shlex.split(cmd_line)
     cmd = parts[0].lower() if parts else ""
 
@@ -102,15 +115,16 @@ def _handle_slash(cmd_line, history, config_path):
         return f"📄 Loaded {fpath.name} ({len(text)} chars). Content added to context.", False
 
     elif cmd == "/bib":
+        if len(parts) >= 4 and parts[1] == "get" and parts[2] in ("doi", "arxiv", "title"):
+            try:
+                return fetch_bibtex(parts[2], " ".join(parts[3:])) or "No results found.", False
+            except Exception as e:
+                return f"Lookup error: {e}", False
         if len(parts) < 3 or parts[1] != "search":
-            return "Usage: /bib search \"query\"", False
+            return "Usage: /bib search \"query\" | /bib get doi|arxiv|title VALUE", False
         query = " ".join(parts[2:])
         try:
-            params = {"query": query, "limit": 5, "fields": _s2_fields()}
-            resp = _s2_get("https://api.semanticscholar.org/graph/v1/paper/search", params)
-            if resp is None:
-                return "Search failed (rate limited)", False
-            data = resp.json().get("data", [])
+            data = _s2_search(query, 5)
             if not data:
                 return "No results found.", False
             lines = []
@@ -124,6 +138,31 @@ def _handle_slash(cmd_line, history, config_path):
         except Exception as e:
             return f"Search error: {e}", False
 
+    elif cmd == "/search":
+        if len(parts) < 2:
+            return "Usage: /search \"query\"", False
+        query = " ".join(parts[1:])
+        try:
+            hits = search(query, limit=5)
+        except Exception as e:
+            return f"Search error: {getattr(e, 'message', None) or e}", False
+        text = format_hits(hits)
+        if hits and pending is not None:
+            context = f"(Excerpts from past notes and drafts matching \"{query}\":)\n{text}"
+            pending.append(context)
+            history.append(("context", context))
+            return f"{text}\n\n🔎 {len(hits)} excerpt(s) will be sent with your next message.", False
+        return text, False
+
+    elif cmd == "/refs":
+        try:
+            index = load_index()
+            if len(parts) > 1:
+                return "\n\n".join(format_who(index, key) for key in parts[1:]), False
+            return format_check(index.check(), index), False
+        except Exception as e:
+            return f"Refs error: {getattr(e, 'message', None) or e}", False
+
     elif cmd == "/constitute":
         return "CONSTITUTE_REQUEST", False
 
@@ -143,7 +182,7 @@ def _handle_slash(cmd_line, history, config_path):
         return "\n".join(lines), False
 
     else:
-        return f"Unknown command: {cmd}\nCommands: /status /phase /next /bib /supply /constitute /review /save /quit", False
+        return f"Unknown command: {cmd}\nCommands: /status /phase /next /bib /refs /search /supply /constitute /review /save /quit", False
 
 
 @click.command("chat")
@@ -165,7 +204,7 @@ def chat_cmd():
 
     click.echo(f"╔══════════════════════════════════════════════╗")
     click.echo(f"║  SPACER — Phase: {phase} ({sub_step})")
-    click.echo(f"║  Commands: /status /phase /bib /supply")
+    click.echo(f"║  Commands: /status /phase /bib /refs /search /supply")
     click.echo(f"║            /constitute /review /next /save /quit")
     click.echo(f"╚══════════════════════════════════════════════╝")
     click.echo()
@@ -190,7 +229,37 @@ def chat_cmd():
     except Exception as e:
         click.echo(f"\n(Could not get initial greeting: {e})\n")
 
+    prefetch_cfg = cfg.get("prefetch") or {}
+    try:
+        rate = float(prefetch_cfg.get("rate", 1.0))
+    except (TypeError, ValueError):
+        raise click.ClickException(f"prefetch.rate must be a number, got {prefetch_cfg.get('rate')!r}")
+    prefetcher = None
+    if prefetch_cfg.get("enabled", True) and rate > 0:  # rate: 0 turns prefetching off
+        prefetcher = Prefetcher(
+            workers=prefetch_cfg.get("workers", 2),
+            rate=rate,
+        )
+        for _, text in history:
+            prefetcher.submit_text(text)
+
+    try:
+        _chat_loop(config_path, system_prompt, api_messages, history, prefetcher)
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
+
+
+def _with_context(pending, text):
+    """`text` preceded by any queued context blocks; empties the queue."""
+    content = "\n\n".join([*pending, text])
+    pending.clear()
+    return content
+
+
+def _chat_loop(config_path, system_prompt, api_messages, history, prefetcher):
     session = PromptSession()
+    pending = []  # context from /search, sent with the next user message
 
     while True:
         try:
@@ -207,7 +276,7 @@ def chat_cmd():
 
         # Handle slash commands
         if user_input.startswith("/"):
-            response, should_quit = _handle_slash(user_input, history, config_path)
+            response, should_quit = _handle_slash(user_input, history, config_path, pending)
 
             if response == "CONSTITUTE_REQUEST":
                 # Ask LLM to generate constitution from discussion
@@ -218,12 +287,14 @@ def chat_cmd():
                     "scope boundaries, positioning decisions, and key papers with their roles. "
                     "Format as markdown suitable for constitution/ideation.md"
                 )
-                api_messages.append({"role": "user", "content": const_prompt})
+                api_messages.append({"role": "user", "content": _with_context(pending, const_prompt)})
                 try:
                     constitution = brain(system_prompt, api_messages)
                     click.echo(f"SPACER:\n{constitution}\n")
                     api_messages.append({"role": "assistant", "content": constitution})
                     history.append(("assistant", constitution))
+                    if prefetcher is not None:
+                        prefetcher.submit_text(constitution)
 
                     # Offer to save
                     save = click.confirm("Save to constitution/ideation.md?", default=True)
@@ -242,7 +313,7 @@ def chat_cmd():
 
         # Regular message — send to brain
         history.append(("user", user_input))
-        api_messages.append({"role": "user", "content": user_input})
+        api_messages.append({"role": "user", "content": _with_context(pending, user_input)})
 
         # Trim API messages to avoid token limits (keep last 40)
         if len(api_messages) > 40:
@@ -254,7 +325,12 @@ def chat_cmd():
         try:
             response = brain(system_prompt, api_messages)
             click.echo(f"\nSPACER: {response}\n")
+            flagged = check_response(response, config_path)
+            if flagged:
+                click.echo(f"⚠ Style: {', '.join(flagged)} (see `spacer lint`)\n")
             api_messages.append({"role": "assistant", "content": response})
             history.append(("assistant", response))
+            if prefetcher is not None:
+                prefetcher.submit_text(response)
         except Exception as e:
             click.echo(f"\nError: {e}\n")
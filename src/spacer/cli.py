@@ -4,14 +4,38 @@ from .status import status_cmd
 from .bib import bib_group
 from .auth import auth_cmd
 from .chat import chat_cmd
+from .results import results_group
+from .graph import stale_cmd
+from .run import run_cmd
+from .render import render_cmd
+from .lint import lint_cmd
+from .refs import refs_group
+from .search import search_cmd
+from .related import mirror_cmd, related_cmd
+from .trace import profile_cmd, start_capture
+from .workspace import workspace_group
+from .pages import pages_cmd
 
 @click.group()
 def cli():
     """SPACER — research paper pipeline management."""
-    pass
+    start_capture()
 
 cli.add_command(init_cmd, "init")
 cli.add_command(status_cmd, "status")
 cli.add_command(bib_group, "bib")
 cli.add_command(auth_cmd, "auth")
 cli.add_command(chat_cmd, "chat")
+cli.add_command(results_group, "results")
+cli.add_command(stale_cmd, "stale")
+cli.add_command(run_cmd, "run")
+cli.add_command(lint_cmd, "lint")
+cli.add_command(refs_group, "refs")
+cli.add_command(search_cmd, "search")
+cli.add_command(profile_cmd, "profile")
+cli.add_command(workspace_group, "workspace")
+cli.add_command(pages_cmd, "pages")
+
+results_group.add_command(render_cmd, "render")
+bib_group.add_command(related_cmd, "related")
+bib_group.add_command(mirror_cmd, "mirror")
@@ -0,0 +1,299 @@
+"""SPACER graph — claims → evidence → results → experiments, with staleness detection.
+
+spacer.yaml declares the chain that grounds every claim:
+
+    claims:
+      - id: C1
+        text: "Selective processing matches full processing on accuracy"
+        evidence: [T1, F1]
+    tables:
+      - id: T1
+        results: [results/ours_yelp/metrics.json]
+    figures:
+      - id: F1
+        results: [results/*/curve.jsonl]
+    experiments:
+      - id: E1
+        cmd: python src/train.py --config configs/yelp.yaml
+        inputs: [src/train.py, configs/yelp.yaml]
+        outputs: [results/ours_yelp/]
+        deps: [E0]
+
+Every node gets a Merkle hash: files hash their contents, tables, figures
+and experiments hash their own spec plus their dependencies, and claims
+hash their evidence. The hashes recorded when a claim was last accepted
+live in .spacer/graph.json; a claim is stale when its hash has moved. File
+hashes are memoized on stat signatures, so a check only re-reads files
+that actually changed.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import click
+
+from .cache import FileHasher, load_json, save_json, state_path
+from .status import load_spacer_config
+
+EVIDENCE_KINDS = ("table", "figure")
+RESOURCE_KEYS = ("cores", "memory")
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def expand_paths(patterns):
+    """Expand file paths, directories and globs into a sorted list of files."""
+    files = set()
+    for pattern in _as_list(patterns):
+        pattern = str(pattern)
+        if any(ch in pattern for ch in "*?["):
+            matches = [p for p in Path(".").glob(pattern) if p.is_file()]
+            files.update(str(p) for p in matches)
+            continue
+        path = Path(pattern)
+        if path.is_dir():
+            files.update(str(p) for p in path.rglob("*") if p.is_file())
+        else:
+            files.add(str(path))
+    return sorted(files)
+
+
+def _spec_hash(spec):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class PaperGraph:
+    """Dependency graph built from spacer.yaml.
+
+    `deps` maps node id → dependency node ids; `own` maps node id → hash of
+    the node itself (file contents or its spec), ignoring dependencies.
+    """
+
+    def __init__(self, cfg, hasher=None):
+        self.cfg = cfg
+        self.hasher = hasher or FileHasher()
+        self.deps = {}
+        self.own = {}
+        self.labels = {}
+        self._hashes = {}
+        self._build()
+
+    def _build(self):
+        experiments = [e for e in _as_list(self.cfg.get("experiments")) if isinstance(e, dict)]
+        outputs = []
+        for exp in experiments:
+            node = f"experiment:{exp.get('id')}"
+            spec = {k: v for k, v in exp.items() if k not in ("id", "outputs", *RESOURCE_KEYS)}
+            deps = [self._file(p) for p in expand_paths(exp.get("inputs"))]
+            deps.extend(f"experiment:{d}" for d in _as_list(exp.get("deps")))
+            self._add(node, _spec_hash(spec), deps)
+            for out in _as_list(exp.get("outputs")):
+                outputs.append((str(out).rstrip("/"), node))
+        for exp in experiments:
+            for dep in _as_list(exp.get("deps")):
+                if f"experiment:{dep}" not in self.deps:
+                    self._add(f"experiment:{dep}", "missing", [])
+        for exp in experiments:
+            self.hash(f"experiment:{exp.get('id')}")  # rejects dependency cycles up front
+        self._hashes = {}  # result files gain producer edges below
+        self._outputs = outputs
+
+        for kind in EVIDENCE_KINDS:
+            for item in _as_list(self.cfg.get(f"{kind}s")):
+                if not isinstance(item, dict):
+                    continue
+                node = f"{kind}:{item.get('id')}"
+                spec = {k: v for k, v in item.items() if k not in ("id", "results")}
+                deps = [self._result(p) for p in expand_paths(item.get("results"))]
+                self._add(node, _spec_hash(spec), deps)
+
+        for claim in _as_list(self.cfg.get("claims")):
+            if not isinstance(claim, dict):
+                continue
+            node = f"claim:{claim.get('id')}"
+            self.labels[node] = claim.get("text", "")
+            deps = []
+            for ev in _as_list(claim.get("evidence")):
+                found = [f"{k}:{ev}" for k in EVIDENCE_KINDS if f"{k}:{ev}" in self.deps]
+                deps.extend(found or [f"missing:{ev}"])
+            for dep in deps:
+                if dep.startswith("missing:"):
+                    self._add(dep, "missing", [])
+            self._add(node, "", deps)
+
+    def _add(self, node, own, deps):
+        self.own[node] = own
+        self.deps[node] = deps
+
+    def _file(self, path):
+        node = f"file:{path}"
+        if node not in self.deps:
+            self._add(node, self.hasher.digest(path), [])
+        return node
+
+    def _result(self, path):
+        """A result file depends on the experiment that writes it, if any."""
+        node = self._file(path)
+        producers = [
+            exp for out, exp in self._outputs
+            if path == out or path.startswith(out + "/")
+        ]
+        for exp in producers:
+            if exp not in self.deps[node]:
+                self.deps[node].append(exp)
+        return node
+
+    def hash(self, node):
+        """Merkle hash of `node`, computed depth-first without recursion."""
+        stack, path, visiting = [(node, False)], [], set()
+        while stack:
+            cur, done = stack.pop()
+            if done:
+                h = hashlib.sha256(self.own[cur].encode())
+                for dep in sorted(self.deps[cur]):
+                    h.update(self._hashes[dep].encode())
+                self._hashes[cur] = h.hexdigest()
+                visiting.discard(cur)
+                path.pop()
+                continue
+            if cur in self._hashes:
+                continue
+            if cur in visiting:
+                chain = path[path.index(cur):] + [cur]
+                raise click.ClickException(
+                    f"Dependency cycle: {' → '.join(n.split(':', 1)[1] for n in chain)}"
+                )
+            visiting.add(cur)
+            path.append(cur)
+            stack.append((cur, True))
+            stack.extend((dep, False) for dep in self.deps[cur] if dep not in self._hashes)
+        return self._hashes[node]
+
+    def reachable(self, node):
+        order, seen, stack = [], set(), [node]
+        while stack:
+            cur = stack.pop()
+            if cur in seen:
+                continue
+            seen.add(cur)
+            order.append(cur)
+            stack.extend(self.deps.get(cur, []))
+        return order
+
+    def claims(self):
+        return [n for n in self.deps if n.startswith("claim:")]
+
+    def snapshot(self):
+        """Recordable state: own hash and full hash for every node."""
+        return {node: {"own": self.own[node], "hash": self.hash(node)} for node in self.deps}
+
+
+def _graph_path():
+    return state_path("graph.json")
+
+
+def find_stale(graph, recorded):
+    """Compare the graph to recorded hashes.
+
+    Returns (stale, unrecorded): `stale` maps claim → changed nodes that
+    explain the change; `unrecorded` lists claims never accepted.
+    """
+    stale, unrecorded = {}, []
+    for claim in graph.claims():
+        rec = recorded.get(claim)
+        if rec is None:
+            unrecorded.append(claim)
+            continue
+        if rec["hash"] == graph.hash(claim):
+            continue
+        changed = []
+        for node in graph.reachable(claim):
+            old = recorded.get(node)
+            if old is None or old["own"] != graph.own[node]:
+                changed.append(node)
+        stale[claim] = changed
+    return stale, unrecorded
+
+
+def accept(graph, recorded, claims=None):
+    """Record the current hashes for `claims` (default: all) and their dependencies."""
+    for claim in claims or graph.claims():
+        for node in graph.reachable(claim):
+            recorded[node] = {"own": graph.own[node], "hash": graph.hash(node)}
+    return recorded
+
+
+def _describe(node):
+    kind, _, name = node.partition(":")
+    if kind == "missing":
+        return f"{name} (evidence id not declared)"
+    if kind == "file":
+        return name
+    return f"{kind} {name}"
+
+
+@click.command("stale")
+@click.option("--accept", "accept_claims", is_flag=True,
+              help="Record current state as fresh (all claims, or those given)")
+@click.option("--json", "as_json", is_flag=True, help="Machine-readable output")
+@click.argument("claims", nargs=-1)
+def stale_cmd(accept_claims, as_json, claims):
+    """Report claims whose evidence changed since they were last accepted."""
+    try:
+        cfg = load_spacer_config("spacer.yaml")
+    except FileNotFoundError:
+        click.echo("No spacer.yaml found. Run `spacer init` first.")
+        raise SystemExit(1)
+
+    graph = PaperGraph(cfg)
+    recorded = load_json(_graph_path(), {})
+    wanted = [f"claim:{c}" for c in claims]
+    unknown = [c for c in wanted if c not in graph.deps]
+    if unknown:
+        click.echo(f"Unknown claim(s): {', '.join(c.split(':', 1)[1] for c in unknown)}")
+        raise SystemExit(1)
+
+    if accept_claims:
+        accept(graph, recorded, wanted or None)
+        save_json(_graph_path(), recorded)
+        graph.hasher.save()
+        click.echo(f"✓ Recorded {len(wanted) or len(graph.claims())} claim(s) as fresh.")
+        return
+
+    stale, unrecorded = find_stale(graph, recorded)
+    graph.hasher.save()
+    if wanted:
+        stale = {c: v for c, v in stale.items() if c in wanted}
+        unrecorded = [c for c in unrecorded if c in wanted]
+
+    if as_json:
+        click.echo(json.dumps({
+            "stale": {c.split(":", 1)[1]: v for c, v in stale.items()},
+            "unrecorded": [c.split(":", 1)[1] for c in unrecorded],
+        }, indent=2))
+        return
+
+    if not graph.claims():
+        click.echo("No claims declared in spacer.yaml.")
+        return
+    if stale:
+        click.echo("Stale claims:")
+        for claim, changed in stale.items():
+            click.echo(f"  ✗ {claim.split(':', 1)[1]}: {graph.labels.get(claim, '')}")
+            for node in changed:
+                click.echo(f"      changed: {_describe(node)}")
+    if unrecorded:
+        click.echo("Not yet accepted (run `spacer stale --accept`):")
+        for claim in unrecorded:
+            click.echo(f"  ○ {claim.split(':', 1)[1]}: {graph.labels.get(claim, '')}")
+    if not stale and not unrecorded:
+        click.echo(f"✓ All {len(graph.claims())} claim(s) up to date.")
+    if stale:
+        raise SystemExit(1)
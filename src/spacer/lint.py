@@ -0,0 +1,292 @@
+"""SPACER lint — flag AI-speak and writer-centred phrasing in paper sections.
+
+All rules are compiled into one Aho-Corasick automaton, so a file is scanned
+once no matter how many phrases are banned. Matching is case-insensitive,
+respects word boundaries, treats any run of whitespace (including line
+breaks) as a single space and ignores LaTeX comments. Results are cached
+per file under .spacer/lint.json and keyed on the file and rule set, so only
+edited sections are re-scanned.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import click
+
+from .cache import FileHasher, load_json, save_json, state_path
+from .status import load_spacer_config
+
+SECTIONS_DIR = Path("paper/sections")
+
+# (phrase, category, hint)
+DEFAULT_RULES = [
+    ("delve", "ai-speak", "say what you examine"),
+    ("delves", "ai-speak", "say what you examine"),
+    ("delving", "ai-speak", "say what you examine"),
+    ("moreover", "ai-speak", "drop it or use 'also'"),
+    ("furthermore", "ai-speak", "drop it or use 'also'"),
+    ("comprehensive", "ai-speak", "say what is covered"),
+    ("leverage", "ai-speak", "use 'use'"),
+    ("leverages", "ai-speak", "use 'uses'"),
+    ("leveraging", "ai-speak", "use 'using'"),
+    ("leveraged", "ai-speak", "use 'used'"),
+    ("it is important to note", "ai-speak", "state the point directly"),
+    ("it is worth noting", "ai-speak", "state the point directly"),
+    ("it should be noted", "ai-speak", "state the point directly"),
+    ("plays a crucial role", "ai-speak", "say what it does"),
+    ("plays a pivotal role", "ai-speak", "say what it does"),
+    ("in the realm of", "ai-speak", "name the field"),
+    ("a testament to", "ai-speak", "state the evidence"),
+    ("paving the way", "ai-speak", "say what it enables"),
+    ("in recent years", "empty-background", "open with the instability, not the trend"),
+    ("has attracted significant attention", "empty-background", "open with the instability, not the trend"),
+    ("has gained significant attention", "empty-background", "open with the instability, not the trend"),
+    ("has gained attention", "empty-background", "open with the instability, not the trend"),
+    ("in this paper we", "writer-centred", "lead with the reader's problem"),
+    ("in this paper, we", "writer-centred", "lead with the reader's problem"),
+    ("we propose a novel", "writer-centred", "show the value instead of claiming novelty"),
+]
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over lower-cased phrases."""
+
+    def __init__(self, phrases):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for idx, phrase in enumerate(phrases):
+            state = 0
+            for ch in "".join(c.lower()[:1] for c in " ".join(phrase.split())):
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(idx)
+        self.lengths = [len(" ".join(p.split())) for p in phrases]
+        self.window = max(self.lengths, default=1)
+
+        # Breadth-first so every fail target is finished before it is used.
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def finditer(self, text):
+        """Yield (start, end, phrase_index) over `text`, whole words only.
+
+        Whitespace runs match a single space; offsets refer to `text`.
+        """
+        state = 0
+        # Original offsets of the last few normalized characters.
+        starts = deque(maxlen=self.window)
+        prev_space = False
+        for pos, ch in enumerate(text):
+            # Per character: some (e.g. "İ") lowercase to two, which would shift offsets.
+            ch = ch.lower()[:1]
+            if ch.isspace():
+                if prev_space:
+                    continue
+                prev_space = True
+                ch = " "
+            else:
+                prev_space = False
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            starts.append(pos)
+            for idx in self.out[state]:
+                n = self.lengths[idx]
+                if n > len(starts):
+                    continue
+                start = starts[-n]
+                end = pos + 1
+                if start > 0 and _is_word(text[start - 1]):
+                    continue
+                if end < len(text) and _is_word(text[end]):
+                    continue
+                yield start, end, idx
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch == "_"
+
+
+def load_rules(cfg=None):
+    """Default rules plus `lint.banned` additions, minus `lint.allow`."""
+    lint_cfg = (cfg or {}).get("lint") or {}
+    allow = {a.lower() for a in lint_cfg.get("allow") or []}
+    rules = [r for r in DEFAULT_RULES if r[0] not in allow]
+    for item in lint_cfg.get("banned") or []:
+        if isinstance(item, dict):
+            phrase, category, hint = item.get("phrase"), item.get("category", "custom"), item.get("hint", "")
+        else:
+            phrase, category, hint = item, "custom", ""
+        if phrase is None or not str(phrase).strip():
+            raise click.ClickException(f"lint.banned entry {item!r} needs a non-empty `phrase`")
+        rules.append((str(phrase), category, hint))
+    return rules
+
+
+def _comment_start(line):
+    """Column of an unescaped LaTeX %, or None."""
+    i = line.find("%")
+    while i >= 0:
+        if i == 0 or line[i - 1] != "\\":
+            return i
+        i = line.find("%", i + 1)
+    return None
+
+
+def lint_text(text, rules, matcher=None, latex=True):
+    """Return hits as dicts with line, col (1-based), phrase, category, hint."""
+    matcher = matcher or PhraseMatcher([r[0] for r in rules])
+    line_starts = [0]
+    for i, ch in enumerate(text):
+        if ch == "\n":
+            line_starts.append(i + 1)
+    hits = []
+    for start, _, idx in matcher.finditer(text):
+        line = bisect.bisect_right(line_starts, start) - 1
+        col = start - line_starts[line]
+        if latex:
+            end = text.find("\n", line_starts[line])
+            comment = _comment_start(text[line_starts[line]:end if end >= 0 else None])
+            if comment is not None and col >= comment:
+                continue
+        phrase, category, hint = rules[idx]
+        hits.append({
+            "line": line + 1, "col": col + 1,
+            "phrase": phrase, "category": category, "hint": hint,
+        })
+    return hits
+
+
+_WORKER = {}
+
+
+def _lint_file(path, rules):
+    key = json.dumps(rules)
+    if _WORKER.get("key") != key:
+        _WORKER["key"] = key
+        _WORKER["matcher"] = PhraseMatcher([r[0] for r in rules])
+    text = Path(path).read_text(encoding="utf-8", errors="replace")
+    return lint_text(text, rules, _WORKER["matcher"])
+
+
+def lint_files(paths, rules, jobs=None):
+    """Lint files, reusing cached hits for files unchanged since the last run.
+
+    Returns {path: hits}.
+    """
+    rules_hash = hashlib.sha256(json.dumps(rules).encode()).hexdigest()
+    cache_path = state_path("lint.json")
+    cache = load_json(cache_path, {})
+    if cache.get("rules") != rules_hash:
+        cache = {"rules": rules_hash, "files": {}}
+    hasher = FileHasher()
+    results, todo = {}, []
+    for path in paths:
+        path = str(path)
+        digest = hasher.digest(path)
+        entry = cache["files"].get(path)
+        if entry and entry["digest"] == digest:
+            results[path] = entry["hits"]
+        else:
+            todo.append((path, digest))
+
+    if len(todo) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+            fresh = list(pool.map(_lint_file, [p for p, _ in todo], [rules] * len(todo)))
+    else:
+        fresh = [_lint_file(p, rules) for p, _ in todo]
+
+    for (path, digest), hits in zip(todo, fresh):
+        results[path] = hits
+        cache["files"][path] = {"digest": digest, "hits": hits}
+    for stale in set(cache["files"]) - {str(p) for p in paths}:
+        if not Path(stale).exists():
+            del cache["files"][stale]
+    if todo:
+        save_json(cache_path, cache)
+    hasher.save()
+    return results
+
+
+_CHAT_MATCHER = {}
+
+
+def check_response(text, config_path="spacer.yaml"):
+    """Style warnings for a chat response (used as a post-filter on brain output)."""
+    try:
+        cfg = load_spacer_config(config_path)
+    except (FileNotFoundError, ValueError):
+        cfg = {}
+    try:
+        rules = load_rules(cfg)
+    except click.ClickException:
+        rules = load_rules({})  # `spacer lint` reports the bad entry; keep chatting
+    key = json.dumps(rules)
+    if _CHAT_MATCHER.get("key") != key:
+        _CHAT_MATCHER["key"] = key
+        _CHAT_MATCHER["matcher"] = PhraseMatcher([r[0] for r in rules])
+    hits = lint_text(text, rules, _CHAT_MATCHER["matcher"], latex=False)
+    return sorted({h["phrase"] for h in hits})
+
+
+def format_hit(path, hit):
+    hint = f" — {hit['hint']}" if hit["hint"] else ""
+    return f"{path}:{hit['line']}:{hit['col']}: [{hit['category']}] \"{hit['phrase']}\"{hint}"
+
+
+@click.command("lint")
+@click.argument("paths", nargs=-1, type=click.Path(exists=True))
+@click.option("--jobs", "-j", type=int, default=None, help="Parallel workers (default: all CPUs)")
+@click.option("--json", "as_json", is_flag=True, help="Machine-readable output")
+def lint_cmd(paths, jobs, as_json):
+    """Flag banned phrases in paper sections (default: paper/sections/*.tex)."""
+    try:
+        cfg = load_spacer_config("spacer.yaml")
+    except FileNotFoundError:
+        cfg = {}
+    files = []
+    for p in paths or [str(SECTIONS_DIR)]:
+        p = Path(p)
+        if p.is_dir():
+            files.extend(sorted(p.glob("*.tex")))
+        elif p.exists():
+            files.append(p)
+    if not files:
+        click.echo("No .tex files to lint.")
+        return
+
+    results = lint_files(files, load_rules(cfg), jobs)
+    if as_json:
+        click.echo(json.dumps(results, indent=2))
+    else:
+        for path in sorted(results):
+            for hit in results[path]:
+                click.echo(format_hit(path, hit))
+    total = sum(len(h) for h in results.values())
+    if not as_json:
+        if total:
+            click.echo(f"\n{total} issue(s) in {sum(1 for h in results.values() if h)} file(s)")
+        else:
+            click.echo(f"✓ {len(results)} file(s) clean")
+    if total:
+        raise SystemExit(1)
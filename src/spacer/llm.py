@@ -6,6 +6,7 @@ import json
 from pathlib import Path
 
 from .auth import get_backend
+from .trace import span
 
 
 # ─── Brain: for discussion, evaluation, planning ───
@@ -36,12 +37,13 @@ def brain(system_prompt: str, messages: list, stream: bool = False):
     prompt_parts.append("<Assistant>")
     full_prompt = "\n".join(prompt_parts)
 
-    if backend == "claude":
-        return _brain_claude(system_prompt, messages)
-    elif backend == "codex":
-        return _brain_codex(full_prompt)
-    else:
-        raise RuntimeError(f"Unknown backend: {backend}")
+    with span("brain", backend=backend, prompt_chars=len(full_prompt), turns=len(messages)):
+        if backend == "claude":
+            return _brain_claude(system_prompt, messages)
+        elif backend == "codex":
+            return _brain_codex(full_prompt)
+        else:
+            raise RuntimeError(f"Unknown backend: {backend}")
 
 
 def _brain_claude(system_prompt: str, messages: list):
@@ -62,12 +64,14 @@ def _brain_claude(system_prompt: str, messages: list):
                 parts.append(f"Assistant: {msg['content']}")
         conversation = "\n\n".join(parts)
 
-        result = subprocess.run(
-            ["claude", "--print", "--system-prompt", sys_file, conversation],
-            capture_output=True,
-            text=True,
-            timeout=120,
-        )
+        with span("subprocess.claude") as s:
+            result = subprocess.run(
+                ["claude", "--print", "--system-prompt", sys_file, conversation],
+                capture_output=True,
+                text=True,
+                timeout=120,
+            )
+            s.set(returncode=result.returncode, out_chars=len(result.stdout))
         return result.stdout.strip() or result.stderr.strip() or "(No response)"
     except subprocess.TimeoutExpired:
         return "(Response timed out)"
@@ -80,12 +84,14 @@ def _brain_claude(system_prompt: str, messages: list):
 def _brain_codex(full_prompt: str):
     """Use codex exec for brain calls."""
     try:
-        result = subprocess.run(
-            ["codex", "exec", full_prompt],
-            capture_output=True,
-            text=True,
-            timeout=120,
-        )
+        with span("subprocess.codex") as s:
+            result = subprocess.run(
+                ["codex", "exec", full_prompt],
+                capture_output=True,
+                text=True,
+                timeout=120,
+            )
+            s.set(returncode=result.returncode, out_chars=len(result.stdout))
         return result.stdout.strip() or result.stderr.strip() or "(No response)"
     except subprocess.TimeoutExpired:
         return "(Response timed out)"
@@ -111,12 +117,13 @@ def hands(prompt: str, workdir: str = ".", backend: str = None, timeout: int = 3
     if not backend:
         raise RuntimeError("No coding agent configured. Run `spacer auth` first.")
 
-    if backend == "claude":
-        return _hands_claude(prompt, workdir, timeout)
-    elif backend == "codex":
-        return _hands_codex(prompt, workdir, timeout)
-    else:
-        raise RuntimeError(f"Unknown backend: {backend}")
+    with span("hands", backend=backend, prompt_chars=len(prompt)):
+        if backend == "claude":
+            return _hands_claude(prompt, workdir, timeout)
+        elif backend == "codex":
+            return _hands_codex(prompt, workdir, timeout)
+        else:
+            raise RuntimeError(f"Unknown backend: {backend}")
 
 
 def _hands_claude(prompt: str, workdir: str, timeout: int):
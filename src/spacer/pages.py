@@ -0,0 +1,380 @@
+"""SPACER pages — estimate page usage without running LaTeX.
+
+Each section in paper/sections/*.tex is reduced to layout statistics: running
+words, paragraphs, headings, display-math lines, figures, tables (and their
+rows), listing lines, list items and cited keys. The statistics are cached
+per file in .spacer/pages.json, keyed on the file's content hash, so only
+edited sections are re-read.
+
+A template model turns statistics into column lines and pages. The
+constants below are rough defaults for common classes; a `pages:` mapping in
+spacer.yaml overrides any of them. `spacer pages --calibrate` compiles the
+paper (or reads an existing PDF) and stores the ratio of real to estimated
+pages, which scales later estimates for that template.
+"""
+
+import json
+import re
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+import click
+
+from .cache import STATE_DIR, FileHasher, load_json, save_json, state_path
+from .lint import _comment_start
+from .refs import CITE_RE
+from .status import load_spacer_config
+
+SECTIONS_DIR = Path("paper/sections")
+MAIN_TEX = Path("paper/main.tex")
+ANALYSIS_VERSION = 1
+
+# Column lines consumed by each element. A page holds columns × lines.
+TEMPLATES = {
+    "acmart": {
+        "columns": 2, "lines": 62, "words_per_line": 8.5, "front": 60, "paragraph": 0.5,
+        "heading": 3.0, "subheading": 2.0, "figure": 22, "wide_figure": 48, "table_base": 5,
+        "table_row": 1.2, "eq_base": 1.5, "eq_line": 1.4, "code_line": 1.0, "item": 0.3, "reference": 3.2,
+    },
+    "IEEEtran": {
+        "columns": 2, "lines": 58, "words_per_line": 9.0, "front": 48, "paragraph": 0.5,
+        "heading": 3.0, "subheading": 2.0, "figure": 20, "wide_figure": 44, "table_base": 5,
+        "table_row": 1.2, "eq_base": 1.5, "eq_line": 1.4, "code_line": 1.0, "item": 0.3, "reference": 2.6,
+    },
+    "acl": {
+        "columns": 2, "lines": 56, "words_per_line": 8.5, "front": 50, "paragraph": 0.5,
+        "heading": 3.0, "subheading": 2.0, "figure": 20, "wide_figure": 44, "table_base": 5,
+        "table_row": 1.2, "eq_base": 1.5, "eq_line": 1.4, "code_line": 1.0, "item": 0.3, "reference": 3.0,
+    },
+    "llncs": {
+        "columns": 1, "lines": 42, "words_per_line": 12.0, "front": 18, "paragraph": 0.4,
+        "heading": 3.0, "subheading": 2.0, "figure": 14, "wide_figure": 14, "table_base": 4,
+        "table_row": 1.1, "eq_base": 1.5, "eq_line": 1.3, "code_line": 1.0, "item": 0.3, "reference": 2.2,
+    },
+    "neurips": {
+        "columns": 1, "lines": 50, "words_per_line": 13.0, "front": 22, "paragraph": 0.6,
+        "heading": 3.0, "subheading": 2.0, "figure": 16, "wide_figure": 16, "table_base": 4,
+        "table_row": 1.1, "eq_base": 1.5, "eq_line": 1.3, "code_line": 1.0, "item": 0.3, "reference": 2.0,
+    },
+    "article": {
+        "columns": 1, "lines": 46, "words_per_line": 13.0, "front": 14, "paragraph": 0.5,
+        "heading": 3.0, "subheading": 2.0, "figure": 15, "wide_figure": 15, "table_base": 4,
+        "table_row": 1.1, "eq_base": 1.5, "eq_line": 1.3, "code_line": 1.0, "item": 0.3, "reference": 2.0,
+    },
+}
+
+FLOAT_RE = re.compile(
+    r"\\begin\{(figure\*?|wrapfigure|table\*?|algorithm\*?|equation\*?|align\*?|gather\*?|multline\*?"
+    r"|eqnarray\*?|displaymath|lstlisting|verbatim|minted|itemize|enumerate|description)\}(.*?)\\end\{\1\}",
+    re.DOTALL,
+)
+DISPLAY_RE = re.compile(r"\\\[(.*?)\\\]|\$\$(.*?)\$\$", re.DOTALL)
+HEADING_RE = re.compile(r"\\(section|subsection|subsubsection|paragraph)\*?\s*(?:\[[^\]]*\])?\s*\{")
+DROP_ARG_RE = re.compile(
+    r"\\(?:label|ref|eqref|cref|Cref|autoref|pageref|url|input|include|includegraphics|bibliography"
+    r"|bibliographystyle|vspace|hspace)\*?\s*(?:\[[^\]]*\])?\s*\{[^}]*\}"
+)
+INLINE_MATH_RE = re.compile(r"\$[^$]+\$")
+COMMAND_RE = re.compile(r"\\[a-zA-Z@]+\*?")
+WORD_RE = re.compile(r"[A-Za-z0-9]+(?:['’-][A-Za-z0-9]+)*")
+ROW_RE = re.compile(r"\\\\")
+OUTPUT_RE = re.compile(r"Output written on .*?\((\d+) pages?", re.DOTALL)
+
+
+def _strip_comments(text):
+    lines = []
+    for line in text.splitlines():
+        cut = _comment_start(line)
+        lines.append(line[:cut] if cut is not None else line)
+    return "\n".join(lines)
+
+
+def analyze(text):
+    """Layout statistics for one section's LaTeX source."""
+    text = _strip_comments(text)
+    stats = {
+        "words": 0, "paragraphs": 0, "headings": 0, "subheadings": 0, "figures": 0, "wide_figures": 0,
+        "tables": [], "eq_blocks": 0, "eq_lines": 0, "code_lines": 0, "items": 0, "cites": [],
+    }
+    cites = set()
+    for m in CITE_RE.finditer(text):
+        cites.update(k.strip() for k in m.group(2).split(",") if k.strip())
+    stats["cites"] = sorted(cites)
+
+    def take(m):
+        env, body = m.group(1), m.group(2)
+        base = env.rstrip("*")
+        if base in ("figure", "wrapfigure"):
+            stats["wide_figures" if env.endswith("*") else "figures"] += 1
+        elif base == "table":
+            stats["tables"].append([len(ROW_RE.findall(body)), env.endswith("*")])
+        elif base in ("algorithm", "lstlisting", "verbatim", "minted"):
+            stats["code_lines"] += sum(1 for line in body.splitlines() if line.strip())
+        elif base in ("itemize", "enumerate", "description"):
+            stats["items"] += body.count("\\item")
+            return body.replace("\\item", "\n\n")  # item text is running text
+        else:
+            stats["eq_blocks"] += 1
+            stats["eq_lines"] += len(ROW_RE.findall(body.strip().rstrip("\\").rstrip())) + 1
+        return " "
+
+    # Lists may hold floats or maths, so expand them until nothing matches.
+    while True:
+        text, n = FLOAT_RE.subn(take, text)
+        if not n:
+            break
+
+    def display(m):
+        stats["eq_blocks"] += 1
+        stats["eq_lines"] += len(ROW_RE.findall(m.group(1) or m.group(2) or "")) + 1
+        return " "
+
+    text = DISPLAY_RE.sub(display, text)
+    for m in HEADING_RE.finditer(text):
+        if m.group(1) == "section":
+            stats["headings"] += 1
+        elif m.group(1) != "paragraph":
+            stats["subheadings"] += 1
+
+    text = DROP_ARG_RE.sub(" ", text)
+    text = CITE_RE.sub(" cite ", text)
+    text = INLINE_MATH_RE.sub(" x ", text)
+    text = COMMAND_RE.sub(" ", text)
+    stats["paragraphs"] = sum(1 for block in re.split(r"\n\s*\n", text) if WORD_RE.search(block))
+    stats["words"] = len(WORD_RE.findall(text))
+    return stats
+
+
+def section_paths():
+    return sorted(SECTIONS_DIR.glob("*.tex"))
+
+
+def section_stats(paths, persist=True):
+    """{path: stats}, re-analysing only files whose contents changed.
+
+    With `persist=False` (used by `spacer status`) the caches are read but
+    never written.
+    """
+    cache_path = state_path("pages.json") if persist else STATE_DIR / "pages.json"
+    cache = load_json(cache_path, {})
+    if cache.get("version") != ANALYSIS_VERSION:
+        cache = {"version": ANALYSIS_VERSION, "sections": {}, "calibration": cache.get("calibration", {})}
+    hasher = FileHasher() if persist else FileHasher(STATE_DIR / "hashes.json")
+    out, dirty = {}, False
+    for path in paths:
+        key = str(path)
+        digest = hasher.digest(path)
+        entry = cache["sections"].get(key)
+        if not entry or entry["hash"] != digest:
+            entry = {"hash": digest, "stats": analyze(Path(path).read_text(encoding="utf-8", errors="replace"))}
+            cache["sections"][key] = entry
+            dirty = True
+        out[key] = entry["stats"]
+    for gone in set(cache["sections"]) - set(out):
+        del cache["sections"][gone]
+        dirty = True
+    if persist:
+        if dirty:
+            save_json(cache_path, cache)
+        hasher.save()
+    return out
+
+
+def template_model(cfg):
+    """(template name, constants) with spacer.yaml `pages:` overrides applied."""
+    project = cfg.get("project") or {}
+    name = project.get("template") or "article"
+    model = dict(TEMPLATES.get(name, TEMPLATES["article"]))
+    overrides = cfg.get("pages") or {}
+    if not isinstance(overrides, dict):
+        raise click.ClickException("`pages` in spacer.yaml must be a mapping of template constants.")
+    for key, value in overrides.items():
+        if key not in model:
+            continue
+        try:
+            if isinstance(value, bool):
+                raise ValueError
+            value = float(value)
+        except (TypeError, ValueError):
+            raise click.ClickException(f"pages.{key} in spacer.yaml must be a number, got {value!r}.")
+        if value < 0 or (value == 0 and key in ("columns", "lines", "words_per_line")):
+            raise click.ClickException(f"pages.{key} in spacer.yaml must be positive, got {value:g}.")
+        model[key] = value
+    return name, model
+
+
+def _column_lines(s, m):
+    tables = sum((m["table_base"] + rows * m["table_row"]) * (m["columns"] if wide else 1)
+                 for rows, wide in s["tables"])
+    return (
+        s["words"] / m["words_per_line"]
+        + s["paragraphs"] * m["paragraph"]
+        + s["headings"] * m["heading"]
+        + s["subheadings"] * m["subheading"]
+        + s["figures"] * m["figure"]
+        + s["wide_figures"] * m["wide_figure"]
+        + tables
+        + s["eq_blocks"] * m["eq_base"]
+        + s["eq_lines"] * m["eq_line"]
+        + s["code_lines"] * m["code_line"]
+        + s["items"] * m["item"]
+    )
+
+
+def estimate(cfg, persist=True):
+    """Estimated page usage: per section, front matter, references and totals."""
+    name, model = template_model(cfg)
+    stats = section_stats(section_paths(), persist)
+    calibration = load_json(STATE_DIR / "pages.json", {}).get("calibration", {}).get(name)
+    factor = calibration["factor"] if calibration else 1.0
+    per_page = model["columns"] * model["lines"]
+
+    sections = {path: _column_lines(s, model) / per_page * factor for path, s in stats.items()}
+    front = model["front"] / per_page * factor
+    cites = set()
+    for s in stats.values():
+        cites.update(s["cites"])
+    references = (model["heading"] + len(cites) * model["reference"]) / per_page * factor if cites else 0.0
+    body = front + sum(sections.values())
+    include_refs = bool((cfg.get("pages") or {}).get("include_references", False))
+    limit = (cfg.get("project") or {}).get("page_limit")
+    return {
+        "template": name,
+        "known_template": name in TEMPLATES,
+        "factor": factor,
+        "calibrated": calibration is not None,
+        "front": front,
+        "sections": sections,
+        "references": references,
+        "cited": len(cites),
+        "body": body,
+        "total": body + references,
+        "counted": body + references if include_refs else body,
+        "include_references": include_refs,
+        "limit": limit,
+    }
+
+
+def format_budget_line(est):
+    """One-line budget for `spacer status`."""
+    counted = est["counted"]
+    if not est["limit"]:
+        return f"Pages: ~{counted:.1f} (no page_limit set)"
+    spare = est["limit"] - counted
+    mark = "✓" if spare >= 0 else "⚠"
+    detail = f"{spare:.1f} to spare" if spare >= 0 else f"{-spare:.1f} over"
+    return f"Pages: ~{counted:.1f} / {est['limit']} {mark} {detail} (estimate; see `spacer pages`)"
+
+
+def format_estimate(est):
+    model = f"{est['template']}" + ("" if est["known_template"] else " → article model")
+    if est["calibrated"]:
+        model += f", calibrated ×{est['factor']:.2f}"
+    lines = [f"{format_budget_line(est).split(' (')[0]}  [{model}]", ""]
+    rows = [("front matter", est["front"])] + [(Path(p).name, v) for p, v in est["sections"].items()]
+    width = max(len(name) for name, _ in rows + [("references", 0)])
+    for name, value in rows:
+        lines.append(f"  {name:<{width}}  {value:>5.2f}  {'█' * int(round(value * 4))}")
+    if est["references"]:
+        note = "" if est["include_references"] else "  (not counted)"
+        lines.append(f"  {'references':<{width}}  {est['references']:>5.2f}  {est['cited']} cited{note}")
+    if not est["sections"]:
+        lines.append(f"  (no sections in {SECTIONS_DIR}/ yet)")
+    return "\n".join(lines)
+
+
+def budget_line(cfg):
+    """Budget line for status, or None when there is nothing to estimate. Writes nothing."""
+    if not SECTIONS_DIR.exists():
+        return None
+    return format_budget_line(estimate(cfg, persist=False))
+
+
+# ─── Calibration ───
+
+def _pdf_pages(pdf):
+    pdf = Path(pdf)
+    log = pdf.with_suffix(".log")
+    if log.exists():
+        m = OUTPUT_RE.search(log.read_text(encoding="utf-8", errors="replace"))
+        if m and abs(pdf.stat().st_mtime - log.stat().st_mtime) < 60:
+            return int(m.group(1))
+    if shutil.which("pdfinfo"):
+        out = subprocess.run(["pdfinfo", str(pdf)], capture_output=True, text=True).stdout
+        m = re.search(r"^Pages:\s+(\d+)", out, re.MULTILINE)
+        if m:
+            return int(m.group(1))
+    n = len(re.findall(rb"/Type\s*/Page(?![a-zA-Z])", pdf.read_bytes()))
+    return n or None
+
+
+def compile_paper(main=MAIN_TEX, timeout=600):
+    """Build the PDF with latexmk (or pdflatex + bibtex). Returns the PDF path."""
+    main = Path(main)
+    cwd, name = main.parent, main.name
+    if shutil.which("latexmk"):
+        steps = [["latexmk", "-pdf", "-interaction=nonstopmode", "-halt-on-error", name]]
+    elif shutil.which("pdflatex"):
+        latex = ["pdflatex", "-interaction=nonstopmode", "-halt-on-error", name]
+        steps = [latex] + ([["bibtex", main.stem]] if shutil.which("bibtex") else []) + [latex, latex]
+    else:
+        raise click.ClickException("No LaTeX toolchain (latexmk or pdflatex) found; use --pdf or --actual.")
+    for cmd in steps:
+        result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0 and cmd[0] != "bibtex":
+            tail = "\n".join(result.stdout.splitlines()[-15:])
+            raise click.ClickException(f"{' '.join(cmd)} failed:\n{tail}")
+    return main.with_suffix(".pdf")
+
+
+def calibrate(cfg, actual):
+    """Store actual / estimated total pages for the current template."""
+    est = estimate(cfg)
+    raw = est["total"] / est["factor"]
+    if raw <= 0:
+        raise click.ClickException("Nothing to calibrate against: no sections found.")
+    cache_path = state_path("pages.json")
+    cache = load_json(cache_path, {})
+    factor = actual / raw
+    cache.setdefault("calibration", {})[est["template"]] = {
+        "factor": factor, "actual": actual, "estimated": raw, "at": time.time(),
+    }
+    save_json(cache_path, cache)
+    return raw, factor
+
+
+@click.command("pages")
+@click.option("--calibrate", "do_calibrate", is_flag=True, help="Compile the paper and fit the model to it")
+@click.option("--pdf", type=click.Path(exists=True), default=None, help="Calibrate against an existing PDF")
+@click.option("--actual", type=int, default=None, help="Calibrate against a known page count")
+@click.option("--json", "as_json", is_flag=True, help="Machine-readable output")
+def pages_cmd(do_calibrate, pdf, actual, as_json):
+    """Estimate page usage per section against page_limit."""
+    try:
+        cfg = load_spacer_config("spacer.yaml")
+    except FileNotFoundError:
+        click.echo("No spacer.yaml found. Run `spacer init` first.")
+        raise SystemExit(1)
+
+    if do_calibrate or pdf or actual:
+        if actual is None:
+            if pdf is None:
+                if not MAIN_TEX.exists():
+                    raise click.ClickException(f"{MAIN_TEX} not found; use --pdf or --actual.")
+                click.echo(f"Compiling {MAIN_TEX}...")
+                pdf = compile_paper()
+            actual = _pdf_pages(pdf)
+            if not actual:
+                raise click.ClickException(f"Could not read a page count from {pdf}; use --actual.")
+        raw, factor = calibrate(cfg, actual)
+        click.echo(f"✓ Calibrated: {actual} real vs {raw:.1f} estimated pages → ×{factor:.2f}")
+        if not 0.67 <= factor <= 1.5:
+            click.echo("  Large correction; check the template in spacer.yaml or set `pages:` constants.")
+
+    est = estimate(cfg)
+    if as_json:
+        click.echo(json.dumps(est, indent=2))
+    else:
+        click.echo(format_estimate(est))
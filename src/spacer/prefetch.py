@@ -0,0 +1,159 @@
+"""SPACER prefetch — resolve papers the brain mentions while the user reads.
+
+After each assistant response, chat hands the text to a `Prefetcher`.
+DOIs, arXiv IDs and quoted or italicised titles are pulled out and queued
+for a small pool of daemon threads, which look them up through the same
+cached paths as `/bib` and `spacer bib get`. A later lookup of the same
+paper is then answered from .spacer/papers.db without touching the network.
+
+Prefetching is best effort: the queue is bounded (overflow is dropped),
+requests are paced by a token bucket separate from interactive use, a 429
+is not retried, and `close()` cancels whatever is still queued. A title is
+cached only when a search hit carries that same title, so a loose match
+from an italicised phrase is never stored as its BibTeX.
+"""
+
+import queue
+import re
+import threading
+import time
+
+from .bib import _make_bibtex, _norm, _s2_search, fetch_bibtex
+from .related import cache_lookup
+from .trace import span
+
+MAX_PER_RESPONSE = 8
+SEARCH_LIMIT = 5  # matches `/bib search`, so its results are warmed too
+
+DOI_RE = re.compile(r"\b10\.\d{4,9}/[^\s\"'<>]+")
+ARXIV_RE = re.compile(
+    r"(?:arxiv(?:\.org/(?:abs|pdf)/|:\s*|\s+)|\b)(\d{2})(\d{2})\.(\d{4,5})(?:v\d+)?\b", re.IGNORECASE
+)
+TITLE_RE = re.compile(r"\"([^\"\n]+)\"|“([^”\n]+)”|(?<![*\w])\*{1,2}([^*\n]+)\*{1,2}(?![*\w])|\b_([^_\n]+)_\b")
+
+
+def _plausible_title(text):
+    words = text.split()
+    return 3 <= len(words) <= 25 and text[0].isupper() and not text.endswith((":", "?"))
+
+
+def extract_candidates(text, limit=MAX_PER_RESPONSE):
+    """[(kind, value)] of DOIs, arXiv IDs and titles mentioned in `text`, in order."""
+    found = []
+    for m in DOI_RE.finditer(text):
+        found.append((m.start(), "doi", m.group(0).rstrip(".,;:)]}")))
+    for m in ARXIV_RE.finditer(text):
+        # Bare IDs need a real YYMM; explicit arXiv mentions are taken as-is.
+        explicit = m.group(0)[:5].lower() == "arxiv"
+        if explicit or (1 <= int(m.group(2)) <= 12 and int(m.group(1)) >= 7):
+            found.append((m.start(), "arxiv", f"{m.group(1)}{m.group(2)}.{m.group(3)}"))
+    for m in TITLE_RE.finditer(text):
+        title = next(g for g in m.groups() if g is not None).strip().rstrip(".,")
+        if title and _plausible_title(title):
+            found.append((m.start(), "title", title))
+
+    found.sort()
+    out, seen = [], set()
+    for _, kind, value in found:
+        key = (kind, _norm(value))
+        if key not in seen:
+            seen.add(key)
+            out.append((kind, value))
+    return out[:limit]
+
+
+class _TokenBucket:
+    """`rate` requests per second with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token; returns how long the caller must wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+def _title_key(title):
+    return " ".join(re.sub(r"\W+", " ", str(title).lower()).split())
+
+
+def _resolve(kind, value):
+    if kind == "title":
+        want = _title_key(value)
+        for paper in _s2_search(value, SEARCH_LIMIT, retries=1) or []:
+            if _title_key(paper.get("title") or "") == want:
+                cache_lookup("title", _norm(value), _make_bibtex(paper))
+                break
+    else:
+        fetch_bibtex(kind, value, retries=1)
+
+
+class Prefetcher:
+    """Bounded background pool that warms the bib cache."""
+
+    def __init__(self, workers=2, rate=1.0, burst=3, maxsize=32):
+        if rate <= 0:
+            raise ValueError(f"prefetch rate must be positive, got {rate!r}")
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.bucket = _TokenBucket(rate, burst)
+        self.cancel = threading.Event()
+        self.seen = set()
+        self.threads = []
+        self.done = 0
+
+    def submit_text(self, text):
+        """Queue every candidate found in `text`. Returns how many were queued."""
+        return sum(self.submit(kind, value) for kind, value in extract_candidates(text))
+
+    def submit(self, kind, value):
+        key = (kind, _norm(value))
+        if self.cancel.is_set() or key in self.seen:
+            return False
+        try:
+            self.queue.put_nowait((kind, value))
+        except queue.Full:
+            return False
+        self.seen.add(key)
+        if not self.threads:
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"spacer-prefetch-{i}", daemon=True)
+                t.start()
+                self.threads.append(t)
+        return True
+
+    def _work(self):
+        while not self.cancel.is_set():
+            try:
+                kind, value = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                if self.cancel.wait(self.bucket.reserve()):
+                    return
+                with span("prefetch", kind=kind):
+                    _resolve(kind, value)
+                self.done += 1
+            except Exception:
+                pass  # best effort; the user can still look it up by hand
+            finally:
+                self.queue.task_done()
+
+    def close(self):
+        """Cancel queued lookups. In-flight requests finish on daemon threads."""
+        self.cancel.set()
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self.queue.task_done()
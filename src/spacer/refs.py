@@ -0,0 +1,244 @@
+"""SPACER refs — citation and cross-reference index between the paper and ref.bib.
+
+The index maps every cite key to the section lines that cite it, every bib
+key to its entry, and every \\label to where it is defined and referenced.
+It lives in .spacer/refs.json; on each query only the .tex files and bib
+whose contents changed are re-parsed, so checks stay instant on theses with
+thousands of citations.
+"""
+
+import bisect
+import re
+from pathlib import Path
+
+import click
+
+from .cache import FileHasher, load_json, save_json, state_path
+from .lint import _comment_start
+
+BIB_PATH = Path("paper/ref.bib")
+TEX_GLOBS = ("paper/*.tex", "paper/sections/*.tex")
+INDEX_VERSION = 2
+
+CITE_RE = re.compile(r"\\(no)?[a-zA-Z]*cite[a-zA-Z]*\*?\s*(?:\[[^\]]*\]\s*){0,2}\{([^}]*)\}")
+LABEL_RE = re.compile(r"\\label\s*\{([^}]*)\}")
+REF_RE = re.compile(r"\\(?:[cC]ref|autoref|eqref|pageref|ref)\*?\s*\{([^}]*)\}")
+ENTRY_RE = re.compile(r"@\s*(\w+)\s*[{(]\s*([^,\s]+)\s*,")
+TITLE_RE = re.compile(r"\btitle\s*=\s*[{\"]\s*\{?([^}\"]*)", re.IGNORECASE)
+SKIP_TYPES = {"string", "comment", "preamble"}
+
+
+def _strip_comments(text):
+    """`text` with LaTeX comments removed; line breaks are kept."""
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        cut = _comment_start(line)
+        if cut is not None:
+            lines[i] = line[:cut]
+    return "\n".join(lines)
+
+
+def _keys(m, group):
+    """(key, offset) for each comma-separated key in a match group."""
+    for k in re.finditer(r"[^,\s][^,]*", m.group(group)):
+        key = k.group(0).strip()
+        if key:
+            yield key, m.start(group) + k.start()
+
+
+def parse_tex(text):
+    """Cites, labels and refs in a .tex file, with 1-based line numbers.
+
+    Commands may span lines (e.g. `\\cite{a,\\n b}`); each key is reported
+    on the line where it appears.
+    """
+    text = _strip_comments(text)
+    line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+
+    def lineno(pos):
+        return bisect.bisect_right(line_starts, pos)
+
+    cites, labels, refs, nocite_all = {}, {}, {}, False
+    for m in CITE_RE.finditer(text):
+        for key, pos in _keys(m, 2):
+            if key == "*" and m.group(1):
+                nocite_all = True
+            else:
+                cites.setdefault(key, []).append(lineno(pos))
+    for m in LABEL_RE.finditer(text):
+        labels.setdefault(m.group(1).strip(), lineno(m.start(1)))
+    for m in REF_RE.finditer(text):
+        for label, pos in _keys(m, 1):
+            refs.setdefault(label, []).append(lineno(pos))
+    return {"cites": cites, "labels": labels, "refs": refs, "nocite_all": nocite_all}
+
+
+def parse_bib(text):
+    """Entries in a .bib file as {key: {type, title, line}}, plus duplicate keys."""
+    entries, duplicates = {}, []
+    matches = list(ENTRY_RE.finditer(text))
+    for i, m in enumerate(matches):
+        etype = m.group(1).lower()
+        if etype in SKIP_TYPES:
+            continue
+        key = m.group(2)
+        body_end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        title = TITLE_RE.search(text, m.end(), body_end)
+        line = text.count("\n", 0, m.start()) + 1
+        if key in entries:
+            duplicates.append(key)
+        entries[key] = {
+            "type": etype,
+            "title": re.sub(r"\s+", " ", title.group(1)).strip() if title else "",
+            "line": line,
+        }
+    return entries, duplicates
+
+
+def tex_files():
+    files = set()
+    for pattern in TEX_GLOBS:
+        files.update(str(p) for p in Path(".").glob(pattern))
+    return sorted(files)
+
+
+class RefIndex:
+    """Persisted cite/bib/label index, refreshed incrementally."""
+
+    def __init__(self, path=None, bib_path=BIB_PATH):
+        self.path = Path(path) if path else state_path("refs.json")
+        self.bib_path = Path(bib_path)
+        data = load_json(self.path, {})
+        if data.get("version") != INDEX_VERSION:
+            data = {"version": INDEX_VERSION, "bib": {}, "sections": {}, "cited_by": {}}
+        self.data = data
+
+    @property
+    def entries(self):
+        return self.data["bib"].get("entries", {})
+
+    @property
+    def cited_by(self):
+        return self.data["cited_by"]
+
+    def refresh(self):
+        """Re-parse changed files. Returns the number of files re-parsed."""
+        hasher = FileHasher()
+        changed = 0
+        bib = self.data["bib"]
+        digest = hasher.digest(self.bib_path)
+        if bib.get("digest") != digest:
+            text = self.bib_path.read_text(encoding="utf-8", errors="replace") if digest != "missing" else ""
+            entries, duplicates = parse_bib(text)
+            self.data["bib"] = {"digest": digest, "entries": entries, "duplicates": duplicates}
+            changed += 1
+
+        sections = self.data["sections"]
+        files = tex_files()
+        for path in set(sections) - set(files):
+            del sections[path]
+            changed += 1
+        for path in files:
+            digest = hasher.digest(path)
+            if sections.get(path, {}).get("digest") == digest:
+                continue
+            parsed = parse_tex(Path(path).read_text(encoding="utf-8", errors="replace"))
+            parsed["digest"] = digest
+            sections[path] = parsed
+            changed += 1
+
+        if changed:
+            cited_by = {}
+            for path, info in sorted(sections.items()):
+                for key, lines in info["cites"].items():
+                    cited_by.setdefault(key, []).extend([path, line] for line in lines)
+            self.data["cited_by"] = cited_by
+            save_json(self.path, self.data)
+        hasher.save()
+        return changed
+
+    def check(self):
+        """Problems as a dict of lists: unknown, uncited, duplicates, broken_refs."""
+        sections = self.data["sections"]
+        entries = self.entries
+        unknown = {k: v for k, v in self.cited_by.items() if k not in entries}
+        nocite_all = any(s["nocite_all"] for s in sections.values())
+        uncited = [] if nocite_all else sorted(k for k in entries if k not in self.cited_by)
+
+        labels = {}
+        for path, info in sections.items():
+            for label in info["labels"]:
+                labels[label] = path
+        broken = []
+        for path, info in sorted(sections.items()):
+            for label, lines in info["refs"].items():
+                if label not in labels:
+                    broken.extend((label, path, line) for line in lines)
+        return {
+            "unknown": unknown,
+            "uncited": uncited,
+            "duplicates": self.data["bib"].get("duplicates", []),
+            "broken_refs": broken,
+        }
+
+    def who_cites(self, key):
+        return [tuple(loc) for loc in self.cited_by.get(key, [])]
+
+
+def load_index():
+    """Open and refresh the project's reference index."""
+    index = RefIndex()
+    index.refresh()
+    return index
+
+
+def format_check(problems, index):
+    lines = []
+    for key, locs in sorted(problems["unknown"].items()):
+        where = ", ".join(f"{p}:{n}" for p, n in locs[:3])
+        more = f" (+{len(locs) - 3} more)" if len(locs) > 3 else ""
+        lines.append(f"  ✗ unknown cite key '{key}' at {where}{more}")
+    for key in problems["duplicates"]:
+        lines.append(f"  ✗ duplicate bib key '{key}'")
+    for label, path, line in problems["broken_refs"]:
+        lines.append(f"  ✗ undefined label '{label}' at {path}:{line}")
+    for key in problems["uncited"]:
+        entry = index.entries[key]
+        lines.append(f"  ? uncited entry '{key}' ({BIB_PATH}:{entry['line']})")
+    if not lines:
+        return (f"✓ {len(index.cited_by)} cited key(s), {len(index.entries)} bib entries; "
+                "no problems.")
+    return "\n".join(lines)
+
+
+def format_who(index, key):
+    entry = index.entries.get(key)
+    head = f"{key}: {entry['title']}" if entry else f"{key}: (not in {BIB_PATH})"
+    locs = index.who_cites(key)
+    if not locs:
+        return f"{head}\n  not cited anywhere"
+    return "\n".join([head] + [f"  {p}:{n}" for p, n in locs])
+
+
+@click.group()
+def refs_group():
+    """Citation cross-references — unknown, uncited, broken."""
+    pass
+
+
+@refs_group.command("check")
+def check():
+    """Check cites against ref.bib and \\ref against \\label."""
+    index = load_index()
+    problems = index.check()
+    click.echo(format_check(problems, index))
+    if problems["unknown"] or problems["duplicates"] or problems["broken_refs"]:
+        raise SystemExit(1)
+
+
+@refs_group.command("who")
+@click.argument("keys", nargs=-1, required=True)
+def who(keys):
+    """Show where each cite KEY is used."""
+    index = load_index()
+    click.echo("\n\n".join(format_who(index, key) for key in keys))
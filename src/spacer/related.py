@@ -0,0 +1,478 @@
+"""SPACER related — rank cached papers against the paper's framing or a draft.
+
+Every paper `spacer bib` fetches from Semantic Scholar (and every paper
+imported with `spacer bib mirror`) is kept in .spacer/papers.db. Their
+titles and abstracts are folded into a sparse TF-IDF matrix kept under
+.spacer/related/ as log-structured segments; an update tokenizes and
+writes only the papers added since the last one (plus occasional merges).
+A query reads just the postings of its own terms and scores every paper
+with a few vectorized scatter-adds, which keeps 100k papers well under a
+second.
+
+The same database keeps a `lookups` table of recent API answers (search
+results, BibTeX by DOI / arXiv ID / title) so repeat lookups, including
+the ones chat prefetches in the background, skip the network. Inside a
+workspace both live in the shared store instead (see workspace.py).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import click
+
+from .cache import load_json, save_json, state_path
+from .status import load_spacer_config
+from .workspace import open_view
+
+STOPWORDS = set("""
+a an and are as at be been but by can do does for from has have how in into is it its
+of on or our over such than that the their them then there these they this those to
+under up via was we were what when where which while who why will with within without
+""".split())
+TOKEN_RE = re.compile(r"[a-z][a-z0-9]+")
+LATEX_CMD_RE = re.compile(r"\\[a-zA-Z]+\*?(\[[^\]]*\])?")
+INDEX_VERSION = 2
+TOKENIZE_CHUNK = 5000
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise click.ClickException("numpy is required for ranking: pip install 'spacer[related]'")
+    return numpy
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+# ─── Paper store ───
+
+class PaperStore:
+    """SQLite table of fetched paper metadata, keyed by S2 paperId (or DOI/arXiv)."""
+
+    source = "local"
+
+    def __init__(self, path=None):
+        self.db = sqlite3.connect(str(path or state_path("papers.db")))
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE NOT NULL, "
+            "title TEXT, abstract TEXT, year INTEGER, venue TEXT, data TEXT)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS lookups ("
+            "kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, fetched REAL NOT NULL, "
+            "PRIMARY KEY (kind, key))"
+        )
+
+    def close(self):
+        self.db.close()
+
+    def add(self, papers):
+        """Insert papers not seen before. Returns rows inserted."""
+        before = self.db.total_changes
+        with self.db:
+            for p in papers:
+                pid = paper_id(p)
+                if not pid or not p.get("title"):
+                    continue
+                self.db.execute(
+                    "INSERT OR IGNORE INTO papers (id, title, abstract, year, venue, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (pid, p.get("title"), p.get("abstract"), p.get("year"), p.get("venue"), json.dumps(p)),
+                )
+        return self.db.total_changes - before
+
+    def since(self, seq):
+        return self.db.execute(
+            "SELECT seq, id, title, abstract FROM papers WHERE seq > ? ORDER BY seq", (seq,)
+        ).fetchall()
+
+    def get(self, ids):
+        rows = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for pid, data in self.db.execute(f"SELECT id, data FROM papers WHERE id IN ({marks})", chunk):
+                rows[pid] = json.loads(data)
+        return rows
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def lookup(self, kind, key, max_age=None):
+        row = self.db.execute(
+            "SELECT value, fetched FROM lookups WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return json.loads(row[0])
+
+    def store_lookup(self, kind, key, value):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO lookups (kind, key, value, fetched) VALUES (?, ?, ?, ?)",
+                (kind, key, json.dumps(value), time.time()),
+            )
+
+
+class WorkspacePaperStore:
+    """The PaperStore interface over a project's view of the workspace store."""
+
+    def __init__(self, view):
+        self.view = view
+        self.source = view.source
+
+    def close(self):
+        self.view.close()
+
+    def add(self, papers):
+        items = [(paper_id(p), p) for p in papers]
+        return self.view.add("paper", [(pid, p) for pid, p in items if pid and p.get("title")])
+
+    def since(self, seq):
+        return [(s, pid, p.get("title"), p.get("abstract")) for s, pid, p in self.view.since("paper", seq)]
+
+    def get(self, ids):
+        return self.view.get_many("paper", ids)
+
+    def count(self):
+        return self.view.count("paper")
+
+    def lookup(self, kind, key, max_age=None):
+        return self.view.get(f"lookup:{kind}", key, max_age)
+
+    def store_lookup(self, kind, key, value):
+        self.view.put(f"lookup:{kind}", key, value)
+
+    def absorb(self, local):
+        """Copy a project's own papers.db into its view. Returns (papers, lookups)."""
+        papers = self.add(json.loads(data) for (data,) in local.db.execute("SELECT data FROM papers"))
+        lookups = 0
+        for kind, key, value, fetched in local.db.execute("SELECT kind, key, value, fetched FROM lookups"):
+            self.view.put(f"lookup:{kind}", key, json.loads(value), fetched)
+            lookups += 1
+        return papers, lookups
+
+
+def open_store():
+    """The project's paper store: its workspace view if it has one, else .spacer/papers.db."""
+    view = open_view()
+    return WorkspacePaperStore(view) if view is not None else PaperStore()
+
+
+def paper_id(paper):
+    eids = paper.get("externalIds") or {}
+    if paper.get("paperId"):
+        return paper["paperId"]
+    if eids.get("DOI"):
+        return f"doi:{eids['DOI'].lower()}"
+    if eids.get("ArXiv"):
+        return f"arxiv:{eids['ArXiv']}"
+    return None
+
+
+def _with_store(fn):
+    """Run fn(store) on the project's store; None outside a project or on error."""
+    if not Path("spacer.yaml").exists():
+        return None
+    try:
+        store = open_store()
+        try:
+            return fn(store)
+        finally:
+            store.close()
+    except Exception:
+        return None
+
+
+def remember_papers(papers):
+    """Record S2 paper dicts in the project's store. Never raises."""
+    _with_store(lambda store: store.add(papers))
+
+
+def cached_lookup(kind, key, max_age=None):
+    """A cached API answer (search results, BibTeX) or None."""
+    return _with_store(lambda store: store.lookup(kind, key, max_age))
+
+
+def cache_lookup(kind, key, value):
+    _with_store(lambda store: store.store_lookup(kind, key, value))
+
+
+# ─── TF-IDF matrix ───
+
+def _tokenize_chunk(docs):
+    """Postings for [(title, abstract)] against a chunk-local vocabulary.
+
+    Returns (terms, cols, tfs, lengths); runs in worker processes for large updates.
+    """
+    np = _numpy()
+    vocab = {}
+    setdefault = vocab.setdefault
+    cols, tfs, lengths = [], [], []
+    for title, abstract in docs:
+        counts = Counter(tokenize(f"{title} {title} {abstract or ''}"))
+        cols.extend([setdefault(tok, len(vocab)) for tok in counts])
+        tfs.extend(counts.values())
+        lengths.append(len(counts))
+    return (list(vocab), np.asarray(cols, dtype=np.int32), np.asarray(tfs, dtype=np.float32),
+            np.asarray(lengths, dtype=np.int64))
+
+
+class TfidfIndex:
+    """Term-major sparse matrix (sublinear tf) over cached titles and abstracts.
+
+    The matrix is a list of segments, each covering a contiguous range of
+    documents. A segment stores postings CSC-style — `indptr` per term, then
+    `docs`/`vals` — plus its documents' norms, as memory-mapped .npy files,
+    so a query only reads the postings of its own terms. An update tokenizes
+    only the new papers and writes them as a new segment; the newest
+    segments are merged while the older one is at most twice the size of
+    the newer, so there are O(log n) segments and each posting is rewritten
+    O(log n) times overall. Norms use the IDF of the moment their segment
+    was last written, and are refreshed whenever it is merged.
+    """
+
+    ARRAYS = ("indptr", "docs", "vals", "norms")
+
+    def __init__(self):
+        self.np = _numpy()
+        np = self.np
+        self.dir = state_path("related", "meta.json").parent
+        self.meta_path = self.dir / "meta.json"
+        meta = load_json(self.meta_path, {})
+        self._reset()
+        if meta.get("version") == INDEX_VERSION and all(
+            (self.dir / f"{seg['name']}.{a}.npy").exists() for seg in meta["segments"] for a in self.ARRAYS
+        ):
+            self.vocab = meta["vocab"]
+            self.ids = meta["ids"]
+            self.seq = meta["seq"]
+            self.source = meta.get("source")
+            self.next_segment = meta["next_segment"]
+            for seg in meta["segments"]:
+                arrays = {a: np.load(self.dir / f"{seg['name']}.{a}.npy", mmap_mode="r") for a in self.ARRAYS}
+                self.segments.append({"name": seg["name"], "lo": seg["lo"], "hi": seg["hi"], **arrays})
+
+    def _reset(self):
+        self.segments = []
+        self.vocab, self.ids, self.seq = {}, [], 0
+        self.next_segment = 0
+        self.source = None
+
+    def _df(self, terms):
+        df = self.np.zeros(len(terms), dtype=self.np.int64)
+        for seg in self.segments:
+            indptr = seg["indptr"]
+            known = terms < len(indptr) - 1
+            t = terms[known]
+            df[known] += indptr[t + 1] - indptr[t]
+        return df
+
+    def _idf(self, df):
+        return self.np.log((1 + len(self.ids)) / (1 + df.astype(self.np.float32))) + 1.0
+
+    def _build_segment(self, cols, docs, vals, lo, hi):
+        """Term-major arrays for postings of documents lo..hi-1 (norms use the current IDF)."""
+        np = self.np
+        n_terms = len(self.vocab)
+        order = np.argsort(cols, kind="stable")  # stable: postings stay in document order
+        cols, docs, vals = cols[order], docs[order], vals[order]
+        seg_df = np.bincount(cols, minlength=n_terms)
+        indptr = np.concatenate([[0], np.cumsum(seg_df)]).astype(np.int64)
+        # Global df: earlier segments plus this one.
+        df = seg_df + self._df(np.arange(n_terms, dtype=np.int64))
+        weighted = vals * self._idf(df)[cols]
+        norms = np.sqrt(np.bincount(docs - lo, weights=weighted * weighted, minlength=hi - lo))
+        name = f"seg{self.next_segment:06d}"
+        self.next_segment += 1
+        return {"name": name, "lo": lo, "hi": hi, "indptr": indptr, "docs": docs.astype(np.int32),
+                "vals": vals.astype(np.float32), "norms": norms.astype(np.float32)}
+
+    def _postings(self, seg):
+        np = self.np
+        cols = np.repeat(np.arange(len(seg["indptr"]) - 1, dtype=np.int32), np.diff(seg["indptr"]))
+        return cols, np.asarray(seg["docs"]), np.asarray(seg["vals"])
+
+    def update(self, store):
+        """Append papers added to `store` since the last update. Returns count."""
+        np = self.np
+        if self.source != store.source:
+            # Joined or left a workspace: sequence numbers mean something else now.
+            self._reset()
+            self.source = store.source
+        new = store.since(self.seq)
+        if not new:
+            return 0
+        lo = len(self.ids)
+        chunks = [[(title, abstract) for _, _, title, abstract in new[i:i + TOKENIZE_CHUNK]]
+                  for i in range(0, len(new), TOKENIZE_CHUNK)]
+        if len(chunks) > 1 and (os.cpu_count() or 1) > 1:
+            with ProcessPoolExecutor() as pool:
+                parts = list(pool.map(_tokenize_chunk, chunks))
+        else:
+            parts = [_tokenize_chunk(chunk) for chunk in chunks]
+        setdefault = self.vocab.setdefault
+        cols, tfs, lengths = [], [], []
+        for terms, local_cols, local_tfs, local_lengths in parts:
+            mapping = np.asarray([setdefault(t, len(self.vocab)) for t in terms], dtype=np.int32)
+            cols.append(mapping[local_cols])
+            tfs.append(local_tfs)
+            lengths.append(local_lengths)
+        self.ids.extend(pid for _, pid, _, _ in new)
+        self.seq = new[-1][0]
+        docs = np.repeat(np.arange(lo, len(self.ids), dtype=np.int32), np.concatenate(lengths))
+        vals = 1.0 + np.log(np.concatenate(tfs))
+
+        written = [self._build_segment(np.concatenate(cols), docs, vals, lo, len(self.ids))]
+        self.segments.append(written[0])
+        dropped = []
+        while len(self.segments) >= 2:
+            older, newer = self.segments[-2], self.segments[-1]
+            if older["hi"] - older["lo"] > 2 * (newer["hi"] - newer["lo"]):
+                break
+            del self.segments[-2:]
+            parts = [self._postings(older), self._postings(newer)]
+            merged = self._build_segment(*(np.concatenate(p) for p in zip(*parts)), older["lo"], newer["hi"])
+            self.segments.append(merged)
+            written.append(merged)
+            dropped.extend([older["name"], newer["name"]])
+        self.save(written, dropped)
+        return len(new)
+
+    def save(self, written, dropped):
+        live = {seg["name"] for seg in self.segments}
+        for seg in written:
+            if seg["name"] not in live:
+                continue
+            for name in self.ARRAYS:
+                tmp = self.dir / f"{seg['name']}.{name}.tmp.npy"
+                self.np.save(tmp, seg[name])
+                tmp.replace(self.dir / f"{seg['name']}.{name}.npy")
+        save_json(self.meta_path, {
+            "version": INDEX_VERSION, "vocab": self.vocab, "ids": self.ids, "seq": self.seq,
+            "source": self.source, "next_segment": self.next_segment,
+            "segments": [{"name": s["name"], "lo": s["lo"], "hi": s["hi"]} for s in self.segments],
+        })
+        for old in self.dir.glob("*.npy"):
+            if old.name.split(".", 1)[0] not in live:
+                old.unlink()
+
+    def rank(self, text, limit=20):
+        """(paper_id, score) of the best-matching papers, by cosine similarity."""
+        np = self.np
+        n_docs = len(self.ids)
+        counts = Counter(self.vocab[t] for t in tokenize(text) if t in self.vocab)
+        if not n_docs or not counts:
+            return []
+        terms = np.fromiter(counts, dtype=np.int64)
+        idf = self._idf(self._df(terms))
+        weights = (np.log(np.fromiter(counts.values(), dtype=np.float32)) + 1.0) * idf
+        weights /= np.linalg.norm(weights)
+
+        scores = np.zeros(n_docs, dtype=np.float64)
+        for seg in self.segments:
+            indptr, seg_docs, seg_vals = seg["indptr"], seg["docs"], seg["vals"]
+            for term, w, term_idf in zip(terms, weights, idf):
+                if term + 1 >= len(indptr):
+                    continue
+                lo, hi = indptr[term], indptr[term + 1]
+                scores[seg_docs[lo:hi]] += (w * term_idf) * seg_vals[lo:hi]
+        norms = np.concatenate([seg["norms"] for seg in self.segments])
+        scores /= np.where(norms > 0, norms, 1.0)
+        k = min(limit, n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+def framing_text(cfg):
+    framing = cfg.get("framing") or {}
+    return " ".join(str(framing.get(k) or "") for k in ("readers", "instability", "cost", "solution"))
+
+
+def section_text(path):
+    text = Path(path).read_text(encoding="utf-8", errors="replace")
+    text = "\n".join(line.split("%", 1)[0] for line in text.splitlines())
+    return LATEX_CMD_RE.sub(" ", text)
+
+
+@click.command("related")
+@click.option("--section", type=click.Path(exists=True), default=None,
+              help="Rank against a section draft instead of the framing")
+@click.option("--query", "query_text", default=None, help="Rank against free text")
+@click.option("--limit", default=15, help="Number of results")
+def related_cmd(section, query_text, limit):
+    """Rank cached papers against the framing in spacer.yaml (or a draft)."""
+    if query_text:
+        text = query_text
+    elif section:
+        text = section_text(section)
+    else:
+        try:
+            text = framing_text(load_spacer_config("spacer.yaml"))
+        except FileNotFoundError:
+            click.echo("No spacer.yaml found. Run `spacer init` first.")
+            raise SystemExit(1)
+        if not text.strip():
+            click.echo("Framing in spacer.yaml is empty; fill it in or use --section/--query.")
+            raise SystemExit(1)
+
+    store = open_store()
+    try:
+        index = TfidfIndex()
+        index.update(store)
+        ranked = index.rank(text, limit)
+        papers = store.get([pid for pid, _ in ranked])
+    finally:
+        store.close()
+    if not ranked:
+        click.echo(f"No related papers among {len(index.ids)} cached. "
+                   "Fetch more with `spacer bib search` or `spacer bib mirror`.")
+        return
+    for i, (pid, score) in enumerate(ranked, 1):
+        p = papers.get(pid, {})
+        click.echo(f"\n[{i}] {p.get('title', '?')} ({p.get('year', '?')})  score {score:.3f}")
+        authors = ", ".join(a.get("name", "") for a in (p.get("authors") or [])[:3])
+        if authors:
+            click.echo(f"    {authors}")
+        eids = p.get("externalIds") or {}
+        if eids.get("DOI"):
+            click.echo(f"    doi: {eids['DOI']}")
+        elif eids.get("ArXiv"):
+            click.echo(f"    arxiv: {eids['ArXiv']}")
+
+
+@click.command("mirror")
+@click.argument("jsonl", type=click.Path(exists=True))
+def mirror_cmd(jsonl):
+    """Import a JSONL dump of S2-style paper records into the local cache."""
+    store = open_store()
+    added, batch = 0, []
+    try:
+        with open(jsonl) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    batch.append(json.loads(line))
+                except ValueError:
+                    continue
+                if len(batch) >= 5000:
+                    added += store.add(batch)
+                    batch = []
+        added += store.add(batch)
+        total = store.count()
+    finally:
+        store.close()
+    click.echo(f"✓ Imported {added} paper(s); {total} cached.")
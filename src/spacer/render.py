@@ -0,0 +1,347 @@
+"""SPACER render — turn declared table/figure specs into paper/ artifacts.
+
+Specs live next to the staleness graph entries in spacer.yaml:
+
+    tables:
+      - id: T1
+        results: [results/ours_yelp/metrics.json, results/base_yelp/metrics.json]
+        metrics: [accuracy, f1]
+        precision: 3
+    figures:
+      - id: F1
+        results: [results/*/train.jsonl]
+        x: step
+        y: loss
+
+Each artifact is keyed by a hash of the data slice it actually uses, its
+spec and the renderer version. paper/artifacts.json records, under
+"table:ID" or "figure:ID", the key, the source files and their digests, so
+unchanged artifacts are skipped after a stat() of their inputs, and an
+artifact whose inputs changed outside its slice is not redrawn. The
+manifest also links every artifact back to the runs it was built from.
+"""
+
+import csv
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import click
+
+from .cache import FileHasher, load_json, save_json
+from .graph import _as_list, expand_paths
+from .results import RESULTS_DIR, iter_lines, update
+from .status import load_spacer_config
+
+MANIFEST = Path("paper/artifacts.json")
+RENDERER_VERSION = {"table": 1, "figure": 1}
+DEFAULT_OUTPUT = {"table": "paper/tables/{id}.tex", "figure": "paper/figures/{id}.pdf"}
+AGGREGATES = ("last", "min", "max", "ema", "count")  # per-metric stats kept for .jsonl logs
+
+
+def _digest(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def run_label(path):
+    """Row/series label for a result file: its run directory, else its stem."""
+    path = Path(path)
+    if path.parent in (Path("."), RESULTS_DIR):
+        return path.stem
+    return path.parent.name
+
+
+def _lookup(record, name):
+    """Fetch `name` from a (possibly nested) dict; dots walk into sub-dicts."""
+    if name in record:
+        return record[name]
+    cur = record
+    for part in name.split("."):
+        if not isinstance(cur, dict) or part not in cur:
+            return None
+        cur = cur[part]
+    return cur
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_result_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except ValueError as e:
+        raise click.ClickException(f"{path} is not valid JSON: {e}")
+
+
+def read_scalars(path, names, agg="last"):
+    """Scalar metrics from a result file (.json, .jsonl or .csv)."""
+    path = Path(path)
+    if not path.exists():
+        return {name: None for name in names}
+    if path.suffix == ".jsonl":
+        stats = update(path)[0].metrics
+        return {name: stats[name][agg] if name in stats else None for name in names}
+    if path.suffix == ".csv":
+        last = {}
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                last = row
+        return {name: _number(last.get(name)) for name in names}
+    record = _load_result_json(path)
+    return {name: _number(_lookup(record, name)) if isinstance(record, dict) else None for name in names}
+
+
+def read_series(path, x, y):
+    """(xs, ys) pairs from a result file; lines without both fields are skipped."""
+    path = Path(path)
+    xs, ys = [], []
+    if not path.exists():
+        return xs, ys
+    if path.suffix == ".jsonl":
+        for raw, _ in iter_lines(path):
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                xv, yv = _number(_lookup(record, x)), _number(_lookup(record, y))
+                if xv is not None and yv is not None:
+                    xs.append(xv)
+                    ys.append(yv)
+        return xs, ys
+    if path.suffix == ".csv":
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                xv, yv = _number(row.get(x)), _number(row.get(y))
+                if xv is not None and yv is not None:
+                    xs.append(xv)
+                    ys.append(yv)
+        return xs, ys
+    record = _load_result_json(path)
+    if isinstance(record, dict):
+        pairs = zip(_lookup(record, x) or [], _lookup(record, y) or [])
+        for xv, yv in pairs:
+            xv, yv = _number(xv), _number(yv)
+            if xv is not None and yv is not None:
+                xs.append(xv)
+                ys.append(yv)
+    return xs, ys
+
+
+def extract_slice(kind, spec, files):
+    """The exact data an artifact is drawn from."""
+    if kind == "table":
+        metrics = [str(m) for m in _as_list(spec.get("metrics"))]
+        agg = spec.get("agg", "last")
+        return {"rows": [[run_label(p), read_scalars(p, metrics, agg)] for p in files]}
+    x, y = spec.get("x", "step"), spec.get("y")
+    if not y:
+        raise click.ClickException(f"Figure {spec.get('id')} needs a `y` field")
+    return {"series": [[run_label(p), *read_series(p, x, y)] for p in files]}
+
+
+_LATEX_SPECIAL = {ch: "\\" + ch for ch in "&%$#_{}"}
+_LATEX_SPECIAL["\\"] = "\\textbackslash{}"
+
+
+def _latex_escape(text):
+    return "".join(_LATEX_SPECIAL.get(ch, ch) for ch in str(text))
+
+
+def render_table(spec, data, output):
+    metrics = [str(m) for m in _as_list(spec.get("metrics"))]
+    precision = int(spec.get("precision", 3))
+    lines = [
+        f"% Generated by `spacer results render` from spec {spec.get('id')}; do not edit.",
+        "\\begin{tabular}{l" + "r" * len(metrics) + "}",
+        "\\toprule",
+        " & ".join(["Run"] + [_latex_escape(m) for m in metrics]) + " \\\\",
+        "\\midrule",
+    ]
+    for label, values in data["rows"]:
+        cells = [_latex_escape(label)]
+        for m in metrics:
+            v = values.get(m)
+            cells.append("--" if v is None else f"{v:.{precision}f}")
+        lines.append(" & ".join(cells) + " \\\\")
+    lines += ["\\bottomrule", "\\end{tabular}", ""]
+    Path(output).write_text("\n".join(lines), encoding="utf-8")
+
+
+def render_figure(spec, data, output):
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        raise RuntimeError("matplotlib is required to render figures: pip install 'spacer[plots]'")
+
+    fig, ax = plt.subplots(figsize=tuple(spec.get("size", (3.3, 2.2))))
+    for label, xs, ys in data["series"]:
+        ax.plot(xs, ys, label=label)
+    ax.set_xlabel(spec.get("xlabel", spec.get("x", "step")))
+    ax.set_ylabel(spec.get("ylabel", spec.get("y")))
+    if spec.get("logy"):
+        ax.set_yscale("log")
+    if len(data["series"]) > 1:
+        ax.legend(fontsize="small")
+    fig.tight_layout()
+    fig.savefig(output)
+    plt.close(fig)
+
+
+RENDERERS = {"table": render_table, "figure": render_figure}
+
+
+def _render_job(kind, spec, data, output):
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    RENDERERS[kind](spec, data, output)
+    return output
+
+
+def declared_artifacts(cfg):
+    """(kind, spec) for every table and figure in spacer.yaml."""
+    items = []
+    for kind in ("table", "figure"):
+        for spec in _as_list(cfg.get(f"{kind}s")):
+            if isinstance(spec, dict) and "id" in spec:
+                agg = spec.get("agg", "last")
+                if kind == "table" and agg not in AGGREGATES:
+                    raise click.ClickException(
+                        f"Table {spec['id']}: unknown agg {agg!r} (expected one of {', '.join(AGGREGATES)})"
+                    )
+                items.append((kind, spec))
+    return items
+
+
+def manifest_key(kind, sid):
+    """Manifest entry name; tables and figures may share an id."""
+    return f"{kind}:{sid}"
+
+
+def plan(items, manifest, hasher, force=False):
+    """Split artifacts into (jobs, fresh). Jobs carry their extracted slice."""
+    jobs, fresh = [], []
+    for kind, spec in items:
+        sid = str(spec["id"])
+        output = spec.get("output") or DEFAULT_OUTPUT[kind].format(id=sid)
+        files = expand_paths(spec.get("results"))
+        inputs = {p: hasher.digest(p) for p in files}
+        spec_hash = _digest(spec)
+        name = manifest_key(kind, sid)
+        legacy = manifest.get(sid)
+        if name not in manifest and isinstance(legacy, dict) and legacy.get("kind") == kind:
+            manifest[name] = manifest.pop(sid)  # entry from before kinds were in the key
+        entry = manifest.get(name) or {}
+        intact = (
+            entry.get("output") == output
+            and entry.get("output_digest") == hasher.digest(output)
+            and entry.get("spec") == spec_hash
+            and entry.get("renderer") == RENDERER_VERSION[kind]
+        )
+        if intact and not force and entry.get("inputs") == inputs:
+            fresh.append(sid)
+            continue
+        data = extract_slice(kind, spec, files)
+        key = _digest({"slice": data, "spec": spec_hash, "renderer": RENDERER_VERSION[kind]})
+        record = {
+            "kind": kind,
+            "output": output,
+            "key": key,
+            "spec": spec_hash,
+            "renderer": RENDERER_VERSION[kind],
+            "inputs": inputs,
+            "sources": sorted({run_label(p) for p in files}),
+        }
+        if intact and not force and entry.get("key") == key:
+            entry.update(record)
+            fresh.append(sid)
+            continue
+        jobs.append((sid, kind, spec, data, output, record))
+    return jobs, fresh
+
+
+def render(jobs, manifest, hasher, workers=None, echo=click.echo):
+    """Render jobs in parallel and record them in the manifest. Returns failures."""
+    failures = []
+    if not jobs:
+        return failures
+
+    def done(sid, output, record, error):
+        if error:
+            failures.append(sid)
+            echo(f"  ✗ {sid}: {error}")
+            return
+        record["output_digest"] = hasher.digest(output)
+        record["rendered"] = datetime.now().isoformat(timespec="seconds")
+        manifest[manifest_key(record["kind"], sid)] = record
+        echo(f"  ✓ {sid} → {output}")
+
+    if len(jobs) == 1 or workers == 1:
+        for sid, kind, spec, data, output, record in jobs:
+            try:
+                _render_job(kind, spec, data, output)
+                done(sid, output, record, None)
+            except Exception as e:
+                done(sid, output, record, e)
+        return failures
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            (pool.submit(_render_job, kind, spec, data, output), sid, output, record)
+            for sid, kind, spec, data, output, record in jobs
+        ]
+        for future, sid, output, record in futures:
+            try:
+                future.result()
+                done(sid, output, record, None)
+            except Exception as e:
+                done(sid, output, record, e)
+    return failures
+
+
+@click.command("render")
+@click.argument("ids", nargs=-1)
+@click.option("--force", is_flag=True, help="Re-render even if inputs are unchanged")
+@click.option("--jobs", "-j", type=int, default=None, help="Parallel renderers (default: all CPUs)")
+def render_cmd(ids, force, jobs):
+    """Render declared tables and figures into paper/, skipping unchanged ones."""
+    try:
+        cfg = load_spacer_config("spacer.yaml")
+    except FileNotFoundError:
+        click.echo("No spacer.yaml found. Run `spacer init` first.")
+        raise SystemExit(1)
+
+    items = declared_artifacts(cfg)
+    if ids:
+        unknown = set(ids) - {str(spec["id"]) for _, spec in items}
+        if unknown:
+            raise click.ClickException(f"Unknown table/figure id(s): {', '.join(sorted(unknown))}")
+        items = [(k, s) for k, s in items if str(s["id"]) in ids]
+    if not items:
+        click.echo("No tables or figures declared in spacer.yaml.")
+        return
+
+    hasher = FileHasher()
+    manifest = load_json(MANIFEST, {})
+    todo, fresh = plan(items, manifest, hasher, force)
+    for sid in fresh:
+        click.echo(f"  · {sid}: up to date")
+    failures = render(todo, manifest, hasher, jobs)
+    save_json(MANIFEST, manifest)
+    hasher.save()
+    click.echo(f"\n{len(todo) - len(failures)} rendered, {len(fresh)} up to date, {len(failures)} failed")
+    if failures:
+        raise SystemExit(1)
@@ -0,0 +1,316 @@
+"""SPACER results — stream metrics out of JSONL step logs without loading them whole.
+
+Training runs append one JSON object per step to a log that can grow to
+several GB. The reader memory-maps the log, walks it one line at a time and
+folds every numeric field into running aggregates. The byte offset and the
+aggregates are checkpointed under .spacer/results/ (or in the workspace
+store, for projects in a workspace), so the next read only parses lines
+appended since the last one.
+"""
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import time
+from pathlib import Path
+
+import click
+
+from .cache import load_json, save_json, state_path
+from .workspace import open_view
+
+RESULTS_DIR = Path("results")
+LOG_NAMES = ("metrics.jsonl", "log.jsonl", "train.jsonl")
+DEFAULT_ALPHA = 0.1
+CHECKPOINT_BYTES = 64 * 1024 * 1024
+STATE_VERSION = 3
+FINGERPRINT_BYTES = 4096
+
+
+def resolve_log(run):
+    """Map a run name (or path) to its JSONL log file."""
+    path = Path(run)
+    if path.is_file():
+        return path
+    candidates = [RESULTS_DIR / f"{run}.jsonl"]
+    for base in (path, RESULTS_DIR / run):
+        if base.is_dir():
+            candidates.extend(base / name for name in LOG_NAMES)
+            candidates.extend(sorted(base.glob("*.jsonl")))
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+    raise FileNotFoundError(f"No JSONL log found for run '{run}'")
+
+
+def iter_lines(path, offset=0):
+    """Yield (line_bytes, end_offset) for each complete line after `offset`.
+
+    A trailing line without a newline is still being written; it is left
+    for the next call and never yielded.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= offset:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = offset
+            while pos < size:
+                nl = mm.find(b"\n", pos, size)
+                if nl < 0:
+                    return
+                yield mm[pos:nl], nl + 1
+                pos = nl + 1
+
+
+def _epoch_bucket(epoch):
+    """Whole-epoch bucket key for an `epoch` field, or None."""
+    if epoch is None or isinstance(epoch, bool):
+        return None
+    try:
+        return str(math.floor(float(epoch)))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class RunAggregates:
+    """Running last/min/max/EMA and per-epoch means for every numeric field.
+
+    Epochs are bucketed by their floor, so trainers that log fractional
+    epochs (0.01, 0.02, ...) still get one bucket per whole epoch; records
+    with a non-numeric epoch are left out of the per-epoch means.
+    """
+
+    def __init__(self, alpha=DEFAULT_ALPHA):
+        self.alpha = alpha
+        self.lines = 0
+        self.bad_lines = 0
+        self.metrics = {}
+        self.epochs = {}
+
+    @classmethod
+    def from_state(cls, state):
+        agg = cls(state["alpha"])
+        agg.lines = state["lines"]
+        agg.bad_lines = state["bad_lines"]
+        agg.metrics = state["metrics"]
+        agg.epochs = state["epochs"]
+        return agg
+
+    def to_state(self):
+        return {
+            "alpha": self.alpha,
+            "lines": self.lines,
+            "bad_lines": self.bad_lines,
+            "metrics": self.metrics,
+            "epochs": self.epochs,
+        }
+
+    def add_line(self, raw):
+        self.lines += 1
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            self.bad_lines += 1
+            return
+        if not isinstance(record, dict):
+            self.bad_lines += 1
+            return
+        self.add(record)
+
+    def add(self, record):
+        epoch = _epoch_bucket(record.get("epoch"))
+        for name, value in record.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            m = self.metrics.get(name)
+            if m is None:
+                self.metrics[name] = {
+                    "last": value, "min": value, "max": value, "ema": value, "count": 1,
+                }
+            else:
+                m["last"] = value
+                m["min"] = min(m["min"], value)
+                m["max"] = max(m["max"], value)
+                m["ema"] = self.alpha * value + (1 - self.alpha) * m["ema"]
+                m["count"] += 1
+            if epoch is not None and name != "epoch":
+                acc = self.epochs.setdefault(name, {}).setdefault(epoch, [0.0, 0])
+                acc[0] += value
+                acc[1] += 1
+
+    def epoch_means(self, name):
+        """Mean of `name` per epoch, in epoch order."""
+        per_epoch = self.epochs.get(name, {})
+
+        def order(key):
+            try:
+                return (0, float(key))
+            except ValueError:
+                return (1, key)
+
+        return [(e, per_epoch[e][0] / per_epoch[e][1]) for e in sorted(per_epoch, key=order)]
+
+
+def _checkpoint_key(log_path):
+    return hashlib.sha1(str(Path(log_path).resolve()).encode()).hexdigest()[:16]
+
+
+def _load_checkpoint(view, key):
+    if view is not None:
+        return view.get("results", key)
+    return load_json(state_path("results", f"{key}.json"))
+
+
+def update(log_path, alpha=DEFAULT_ALPHA):
+    """Fold lines appended since the last checkpoint into the aggregates.
+
+    Returns (aggregates, new_lines). Starts over if the log was truncated or
+    replaced, or if the EMA smoothing factor changed.
+    """
+    log_path = Path(log_path)
+    st = os.stat(log_path)
+    view = open_view()
+    try:
+        return _update(log_path, st, view, _checkpoint_key(log_path), alpha)
+    finally:
+        if view is not None:
+            view.close()
+
+
+def _fingerprint(log_path, offset):
+    """Hash of the first and last FINGERPRINT_BYTES before `offset`.
+
+    Catches a log rewritten in place (same inode) that has grown back past
+    the checkpointed offset.
+    """
+    h = hashlib.sha1()
+    with open(log_path, "rb") as f:
+        h.update(f.read(min(offset, FINGERPRINT_BYTES)))
+        f.seek(max(0, offset - FINGERPRINT_BYTES))
+        h.update(f.read(min(offset, FINGERPRINT_BYTES)))
+    return h.hexdigest()
+
+
+def _update(log_path, st, view, key, alpha):
+    state = _load_checkpoint(view, key)
+    if (
+        state
+        and state.get("version") == STATE_VERSION
+        and state.get("inode") == st.st_ino
+        and state.get("offset", 0) <= st.st_size
+        and state.get("alpha") == alpha
+        and state.get("fingerprint") == _fingerprint(log_path, state.get("offset", 0))
+    ):
+        agg = RunAggregates.from_state(state)
+        offset = state["offset"]
+        reset = False
+    else:
+        agg = RunAggregates(alpha)
+        offset = 0
+        reset = True
+
+    start_lines = agg.lines
+    last_saved = offset
+    for raw, offset in iter_lines(log_path, offset):
+        agg.add_line(raw)
+        if offset - last_saved >= CHECKPOINT_BYTES:
+            _save_checkpoint(view, key, log_path, st.st_ino, offset, agg)
+            last_saved = offset
+    if offset != last_saved or reset:
+        _save_checkpoint(view, key, log_path, st.st_ino, offset, agg)
+    return agg, agg.lines - start_lines
+
+
+def _save_checkpoint(view, key, log_path, inode, offset, agg):
+    state = agg.to_state()
+    state.update({
+        "version": STATE_VERSION,
+        "path": str(log_path),
+        "inode": inode,
+        "offset": offset,
+        "fingerprint": _fingerprint(log_path, offset),
+    })
+    if view is not None:
+        view.put("results", key, state)
+    else:
+        save_json(state_path("results", f"{key}.json"), state)
+
+
+def _fmt(value):
+    if isinstance(value, int):
+        return str(value)
+    return f"{value:.4g}"
+
+
+def format_aggregates(agg, metrics=None, epochs=False):
+    names = [m for m in (metrics or sorted(agg.metrics)) if m in agg.metrics]
+    if not names:
+        return "No numeric metrics yet."
+    width = max(len(n) for n in names)
+    lines = [f"{'metric':<{width}}  {'last':>10} {'min':>10} {'max':>10} {'ema':>10} {'n':>8}"]
+    for name in names:
+        m = agg.metrics[name]
+        lines.append(
+            f"{name:<{width}}  {_fmt(m['last']):>10} {_fmt(m['min']):>10} "
+            f"{_fmt(m['max']):>10} {_fmt(m['ema']):>10} {m['count']:>8}"
+        )
+    if epochs:
+        for name in names:
+            means = agg.epoch_means(name)
+            if means:
+                lines.append("")
+                lines.append(f"{name} per epoch:")
+                lines.extend(f"  {e}: {_fmt(v)}" for e, v in means)
+    if agg.bad_lines:
+        lines.append(f"\n({agg.bad_lines} unparseable line(s) skipped)")
+    return "\n".join(lines)
+
+
+@click.group()
+def results_group():
+    """Result files — read metrics straight from run logs."""
+    pass
+
+
+@results_group.command("summary")
+@click.argument("run")
+@click.option("--metric", "-m", multiple=True, help="Only show these metrics")
+@click.option("--epochs", is_flag=True, help="Also show per-epoch means")
+@click.option("--alpha", default=DEFAULT_ALPHA, show_default=True, help="EMA smoothing factor")
+def summary(run, metric, epochs, alpha):
+    """Summarize a run's JSONL log (incremental)."""
+    try:
+        log_path = resolve_log(run)
+    except FileNotFoundError as e:
+        click.echo(str(e))
+        raise SystemExit(1)
+    agg, new = update(log_path, alpha)
+    click.echo(f"{log_path}: {agg.lines} lines ({new} new)\n")
+    click.echo(format_aggregates(agg, metric, epochs))
+
+
+@results_group.command("tail")
+@click.argument("run")
+@click.option("--metric", "-m", multiple=True, help="Only show these metrics")
+@click.option("--interval", default=2.0, show_default=True, help="Seconds between polls")
+@click.option("--alpha", default=DEFAULT_ALPHA, show_default=True, help="EMA smoothing factor")
+def tail(run, metric, interval, alpha):
+    """Follow a live run, printing aggregates as new steps arrive."""
+    try:
+        log_path = resolve_log(run)
+    except FileNotFoundError as e:
+        click.echo(str(e))
+        raise SystemExit(1)
+    click.echo(f"Following {log_path} (Ctrl-C to stop)")
+    try:
+        while True:
+            agg, new = update(log_path, alpha)
+            if new:
+                click.echo(f"\n[{time.strftime('%H:%M:%S')}] {agg.lines} lines (+{new})")
+                click.echo(format_aggregates(agg, metric))
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,314 @@
+"""SPACER run — execute declared experiments as a cached, parallel DAG.
+
+Experiments are declared in spacer.yaml:
+
+    experiments:
+      - id: E1
+        cmd: python src/train.py --config configs/yelp.yaml
+        inputs: [src/train.py, configs/yelp.yaml]
+        outputs: [results/ours_yelp/]
+        deps: [E0]
+        cores: 4
+        memory: 8G
+
+A step's cache key hashes its command, the contents of its inputs and the
+keys of the steps it depends on. When the key matches the last successful
+run and the recorded outputs are untouched, the step is skipped — so after a
+one-line change only the affected experiments re-execute. Steps run as
+subprocesses, as many at a time as the core and memory budget allows.
+Each step logs to .spacer/logs/<id>.log (ids that are not safe file names
+are hashed); keys and timings are recorded in .spacer/runs.json.
+"""
+
+import hashlib
+import os
+import re
+import signal
+import subprocess
+import time
+from datetime import datetime
+
+import click
+
+from .cache import FileHasher, load_json, save_json, state_path
+from .graph import _as_list, expand_paths
+from .status import load_spacer_config
+
+POLL_INTERVAL = 0.05
+_MEMORY_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]i?b?|b)?\s*$", re.IGNORECASE)
+_MEMORY_UNITS = {"": 1, "b": 1 / (1024 * 1024), "k": 1 / 1024, "m": 1, "g": 1024, "t": 1024 * 1024}
+
+
+def parse_memory(value):
+    """Parse "512M" / "8G" / "1024B" (bytes) / 2048 (MB) into megabytes."""
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        return float(value)
+    m = _MEMORY_RE.match(str(value))
+    if not m:
+        raise click.BadParameter(f"Cannot parse memory size: {value!r}")
+    return float(m.group(1)) * _MEMORY_UNITS[(m.group(2) or "").lower()[:1]]
+
+
+def log_path(sid):
+    """.spacer/logs/<id>.log; ids that are not safe file names get a hashed name."""
+    name = re.sub(r"[^\w.-]+", "_", sid)
+    if name != sid:
+        name = f"{name}-{hashlib.sha1(sid.encode()).hexdigest()[:8]}"
+    return state_path("logs", f"{name}.log")
+
+
+def _total_memory_mb():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return float("inf")
+
+
+def load_experiments(cfg):
+    """Experiments from spacer.yaml as {id: spec}, validating the DAG."""
+    steps = {}
+    for exp in _as_list(cfg.get("experiments")):
+        if not isinstance(exp, dict) or "id" not in exp:
+            continue
+        steps[str(exp["id"])] = exp
+    for sid, exp in steps.items():
+        for dep in _as_list(exp.get("deps")):
+            if str(dep) not in steps:
+                raise click.ClickException(f"Experiment {sid} depends on unknown experiment {dep}")
+    order = topo_order(steps)
+    return steps, order
+
+
+def topo_order(steps):
+    order, state = [], {}
+
+    def visit(sid, chain):
+        if state.get(sid) == "done":
+            return
+        if state.get(sid) == "visiting":
+            raise click.ClickException(f"Dependency cycle: {' → '.join(chain + [sid])}")
+        state[sid] = "visiting"
+        for dep in _as_list(steps[sid].get("deps")):
+            visit(str(dep), chain + [sid])
+        state[sid] = "done"
+        order.append(sid)
+
+    for sid in steps:
+        visit(sid, [])
+    return order
+
+
+def select(steps, order, targets):
+    """Targets plus everything they depend on, in topological order."""
+    if not targets:
+        return list(order)
+    wanted, stack = set(), list(targets)
+    while stack:
+        sid = stack.pop()
+        if sid not in steps:
+            raise click.ClickException(f"Unknown experiment: {sid}")
+        if sid in wanted:
+            continue
+        wanted.add(sid)
+        stack.extend(str(d) for d in _as_list(steps[sid].get("deps")))
+    return [sid for sid in order if sid in wanted]
+
+
+def step_key(exp, hasher, dep_keys):
+    h = hashlib.sha256()
+    h.update(str(exp.get("cmd", "")).encode())
+    for path in expand_paths(exp.get("inputs")):
+        h.update(f"\0{path}\0{hasher.digest(path)}".encode())
+    for key in dep_keys:
+        h.update(f"\0dep\0{key}".encode())
+    return h.hexdigest()
+
+
+def output_digests(exp, hasher):
+    return {path: hasher.digest(path) for path in expand_paths(exp.get("outputs"))}
+
+
+def is_cached(record, key, exp, hasher):
+    if not record or record.get("key") != key or record.get("returncode") != 0:
+        return False
+    return output_digests(exp, hasher) == record.get("outputs", {})
+
+
+class Scheduler:
+    """Launch ready steps as subprocesses within a core/memory budget."""
+
+    def __init__(self, steps, order, cores, memory_mb, force=False, echo=click.echo):
+        self.steps = steps
+        self.order = order
+        self.cores = cores
+        self.memory_mb = memory_mb
+        self.force = force
+        self.echo = echo
+        self.hasher = FileHasher()
+        self.records = load_json(state_path("runs.json"), {})
+        self.keys = {}
+        self.status = {}
+        self.running = {}
+
+    def _need(self, exp):
+        cores = max(1, int(exp.get("cores", 1)))
+        return min(cores, self.cores), min(parse_memory(exp.get("memory")), self.memory_mb)
+
+    def _free(self):
+        used_cores = sum(r["need"][0] for r in self.running.values())
+        used_mem = sum(r["need"][1] for r in self.running.values())
+        return self.cores - used_cores, self.memory_mb - used_mem
+
+    def _ready(self, sid):
+        deps = [str(d) for d in _as_list(self.steps[sid].get("deps"))]
+        if any(self.status.get(d) in ("failed", "blocked") for d in deps):
+            return "blocked"
+        if all(self.status.get(d) in ("ok", "cached") for d in deps):
+            return "ready"
+        return "waiting"
+
+    def _launch(self, sid, need):
+        exp = self.steps[sid]
+        log = open(log_path(sid), "w")
+        log.write(f"$ {exp['cmd']}\n")
+        log.flush()
+        env = dict(os.environ, SPACER_STEP=sid)
+        # Own process group, so stopping a step also stops what its shell started.
+        proc = subprocess.Popen(exp["cmd"], shell=True, stdout=log, stderr=subprocess.STDOUT, env=env,
+                                start_new_session=True)
+        self.running[sid] = {"proc": proc, "log": log, "start": time.time(), "need": need}
+        self.echo(f"  ▶ {sid}: {exp['cmd']}")
+
+    def _finish(self, sid, returncode):
+        run = self.running.pop(sid)
+        run["log"].close()
+        elapsed = time.time() - run["start"]
+        exp = self.steps[sid]
+        ok = returncode == 0
+        self.status[sid] = "ok" if ok else "failed"
+        self.records[sid] = {
+            "key": self.keys[sid],
+            "returncode": returncode,
+            "duration": round(elapsed, 3),
+            "finished": datetime.now().isoformat(timespec="seconds"),
+            "outputs": output_digests(exp, self.hasher) if ok else {},
+        }
+        self._save()
+        mark = "✓" if ok else "✗"
+        suffix = "" if ok else f" (exit {returncode}, see {log_path(sid)})"
+        self.echo(f"  {mark} {sid} [{elapsed:.1f}s]{suffix}")
+
+    def _save(self):
+        save_json(state_path("runs.json"), self.records)
+        self.hasher.save()
+
+    def stop(self, grace=5.0):
+        """Terminate running steps (whole process groups) and keep finished records."""
+        for run in self.running.values():
+            try:
+                os.killpg(run["proc"].pid, signal.SIGTERM)
+            except OSError:
+                pass
+        deadline = time.time() + grace
+        for sid, run in list(self.running.items()):
+            try:
+                run["proc"].wait(timeout=max(0.0, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                try:
+                    os.killpg(run["proc"].pid, signal.SIGKILL)
+                except OSError:
+                    pass
+                run["proc"].wait()
+            run["log"].close()
+            self.echo(f"  ✗ {sid}: stopped")
+        self.running.clear()
+        self._save()
+
+    def run(self, dry_run=False):
+        pending = list(self.order)
+        while pending or self.running:
+            for sid in list(pending):
+                state = self._ready(sid)
+                if state == "waiting":
+                    continue
+                if state == "blocked":
+                    pending.remove(sid)
+                    self.status[sid] = "blocked"
+                    self.echo(f"  - {sid}: skipped (dependency failed)")
+                    continue
+                exp = self.steps[sid]
+                dep_keys = [self.keys[str(d)] for d in _as_list(exp.get("deps"))]
+                self.keys[sid] = step_key(exp, self.hasher, dep_keys)
+                if not self.force and is_cached(self.records.get(sid), self.keys[sid], exp, self.hasher):
+                    pending.remove(sid)
+                    self.status[sid] = "cached"
+                    self.echo(f"  · {sid}: up to date")
+                    continue
+                if dry_run:
+                    pending.remove(sid)
+                    self.status[sid] = "ok"
+                    self.echo(f"  ▶ {sid}: would run `{exp.get('cmd')}`")
+                    continue
+                need = self._need(exp)
+                free_cores, free_mem = self._free()
+                if need[0] <= free_cores and need[1] <= free_mem:
+                    pending.remove(sid)
+                    self._launch(sid, need)
+
+            for sid, run in list(self.running.items()):
+                returncode = run["proc"].poll()
+                if returncode is not None:
+                    self._finish(sid, returncode)
+            if self.running:
+                time.sleep(POLL_INTERVAL)
+
+        if not dry_run:
+            self._save()
+        else:
+            self.hasher.save()
+        return self.status
+
+
+@click.command("run")
+@click.argument("targets", nargs=-1)
+@click.option("--cores", "-j", type=int, default=None, help="Core budget (default: all CPUs)")
+@click.option("--memory", default=None, help="Memory budget, e.g. 32G (default: physical RAM)")
+@click.option("--force", is_flag=True, help="Ignore the cache and re-run every selected step")
+@click.option("--dry-run", "-n", is_flag=True, help="Show what would run without running it")
+def run_cmd(targets, cores, memory, force, dry_run):
+    """Run experiments from spacer.yaml, skipping steps whose inputs are unchanged."""
+    try:
+        cfg = load_spacer_config("spacer.yaml")
+    except FileNotFoundError:
+        click.echo("No spacer.yaml found. Run `spacer init` first.")
+        raise SystemExit(1)
+
+    steps, order = load_experiments(cfg)
+    missing_cmd = [sid for sid in steps if not steps[sid].get("cmd")]
+    if missing_cmd:
+        raise click.ClickException(f"Experiment(s) without a cmd: {', '.join(missing_cmd)}")
+    selected = select(steps, order, list(targets))
+    if not selected:
+        click.echo("No experiments declared in spacer.yaml.")
+        return
+
+    budget_cores = cores or os.cpu_count() or 1
+    budget_mem = parse_memory(memory) if memory else _total_memory_mb()
+    click.echo(f"Running {len(selected)} experiment(s) with {budget_cores} core(s)")
+    start = time.time()
+    sched = Scheduler(steps, selected, budget_cores, budget_mem, force=force)
+    try:
+        status = sched.run(dry_run=dry_run)
+    except BaseException:
+        sched.stop()
+        raise
+
+    counts = {}
+    for value in status.values():
+        counts[value] = counts.get(value, 0) + 1
+    summary = ", ".join(f"{n} {k}" for k, n in sorted(counts.items()))
+    click.echo(f"\nDone in {time.time() - start:.1f}s: {summary}")
+    if counts.get("failed") or counts.get("blocked"):
+        raise SystemExit(1)
@@ -0,0 +1,151 @@
+"""SPACER search — full-text search over notes, transcripts, sections and constitution.
+
+Files are split at markdown headings and LaTeX \\section commands (so every
+chat turn in a transcript is its own hit) and stored in a SQLite FTS5 index
+at .spacer/search.db. Only files whose contents changed since the last query
+are re-indexed. Hits are ranked by BM25 and returned with a snippet.
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+
+import click
+
+from .cache import FileHasher, state_path
+
+CORPUS = {
+    "notes": ("notes/**/*.md",),
+    "paper": ("paper/sections/*.tex", "paper/plan/*.md"),
+    "constitution": ("constitution/**/*.md",),
+}
+HEADING_RE = re.compile(r"^(?:#{1,6}\s+(.*)|\\(?:sub)*section\*?\s*\{([^}]*)\})")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, digest TEXT NOT NULL, kind TEXT NOT NULL);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+    heading, body, path UNINDEXED, kind UNINDEXED, line UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+def corpus_files():
+    """(path, kind) for every searchable file in the project."""
+    found = {}
+    for kind, patterns in CORPUS.items():
+        for pattern in patterns:
+            for p in Path(".").glob(pattern):
+                if p.is_file():
+                    found.setdefault(str(p), kind)
+    return sorted(found.items())
+
+
+def split_chunks(text):
+    """Split a document at headings into (heading, body, start_line)."""
+    chunks, heading, body, start = [], "", [], 1
+    for lineno, line in enumerate(text.splitlines(), 1):
+        m = HEADING_RE.match(line)
+        if m:
+            if heading or any(l.strip() for l in body):
+                chunks.append((heading, "\n".join(body), start))
+            heading, body, start = (m.group(1) or m.group(2) or "").strip(), [], lineno
+        else:
+            body.append(line)
+    if heading or any(l.strip() for l in body):
+        chunks.append((heading, "\n".join(body), start))
+    return chunks
+
+
+class SearchIndex:
+    """SQLite FTS5 index over the project corpus."""
+
+    def __init__(self, path=None):
+        self.db = sqlite3.connect(str(path or state_path("search.db")))
+        try:
+            self.db.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            raise click.ClickException(f"SQLite FTS5 is unavailable in this Python build ({e})")
+
+    def close(self):
+        self.db.close()
+
+    def refresh(self):
+        """Re-index changed files and drop deleted ones. Returns files touched."""
+        hasher = FileHasher()
+        known = dict(self.db.execute("SELECT path, digest FROM files"))
+        current = corpus_files()
+        touched = 0
+        with self.db:
+            for path in set(known) - {p for p, _ in current}:
+                self._drop(path)
+                touched += 1
+            for path, kind in current:
+                digest = hasher.digest(path)
+                if known.get(path) == digest:
+                    continue
+                self._drop(path)
+                text = Path(path).read_text(encoding="utf-8", errors="replace")
+                self.db.executemany(
+                    "INSERT INTO chunks (heading, body, path, kind, line) VALUES (?, ?, ?, ?, ?)",
+                    [(h, b, path, kind, line) for h, b, line in split_chunks(text)],
+                )
+                self.db.execute("INSERT INTO files (path, digest, kind) VALUES (?, ?, ?)", (path, digest, kind))
+                touched += 1
+        hasher.save()
+        return touched
+
+    def _drop(self, path):
+        self.db.execute("DELETE FROM chunks WHERE path = ?", (path,))
+        self.db.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def search(self, query, limit=10, kind=None):
+        """Ranked hits as dicts with path, line, heading, snippet."""
+        sql = (
+            "SELECT path, line, heading, snippet(chunks, 1, '[', ']', '…', 16) "
+            "FROM chunks WHERE chunks MATCH ?"
+            + (" AND kind = ?" if kind else "")
+            + " ORDER BY bm25(chunks, 2.0, 1.0) LIMIT ?"
+        )
+        args = [kind] if kind else []
+        try:
+            rows = self.db.execute(sql, [query, *args, limit]).fetchall()
+        except sqlite3.OperationalError:
+            # Not valid FTS5 syntax; search for the words literally instead.
+            quoted = " ".join(f'"{w}"' for w in re.findall(r"\w+", query))
+            if not quoted:
+                return []
+            rows = self.db.execute(sql, [quoted, *args, limit]).fetchall()
+        return [
+            {"path": p, "line": line, "heading": h, "snippet": " ".join(s.split())}
+            for p, line, h, s in rows
+        ]
+
+
+def search(query, limit=10, kind=None):
+    """Refresh the index and run a query."""
+    index = SearchIndex()
+    try:
+        index.refresh()
+        return index.search(query, limit, kind)
+    finally:
+        index.close()
+
+
+def format_hits(hits):
+    if not hits:
+        return "No matches."
+    lines = []
+    for hit in hits:
+        heading = f" — {hit['heading']}" if hit["heading"] else ""
+        lines.append(f"{hit['path']}:{hit['line']}{heading}")
+        lines.append(f"    {hit['snippet']}")
+    return "\n".join(lines)
+
+
+@click.command("search")
+@click.argument("query", nargs=-1, required=True)
+@click.option("--limit", default=10, help="Number of results")
+@click.option("--kind", type=click.Choice(sorted(CORPUS)), default=None, help="Restrict to one corpus")
+def search_cmd(query, limit, kind):
+    """Search notes, transcripts, paper sections and constitution."""
+    click.echo(format_hits(search(" ".join(query), limit, kind)))
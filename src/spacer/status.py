@@ -2,6 +2,8 @@ import os
 import click
 import yaml
 
+from .trace import span
+
 PHASE_ORDER = ["ideation", "outlining", "drafting", "revision", "submission"]
 
 NEXT_ACTIONS = {
@@ -18,7 +20,7 @@ def load_spacer_config(config_path="spacer.yaml"):
     if not os.path.exists(config_path):
         raise FileNotFoundError(config_path)
 
-    with open(config_path) as f:
+    with span("config.load"), open(config_path) as f:
         cfg = yaml.safe_load(f) or {}
     if not isinstance(cfg, dict):
         raise ValueError("spacer.yaml must contain a YAML mapping.")
@@ -93,6 +95,16 @@ def format_status(cfg):
         for key, value in filled.items():
             lines.append(f"  {key}: {value}")
 
+    # Page budget
+    from .pages import budget_line
+    try:
+        budget = budget_line(cfg)
+    except (OSError, yaml.YAMLError, click.ClickException) as e:
+        budget = f"Pages: estimate unavailable ({getattr(e, 'message', None) or e})"
+    if budget:
+        lines.append("")
+        lines.append(budget)
+
     # Next action
     lines.append("")
     lines.append(f"Next: {NEXT_ACTIONS.get(phase, 'Keep going!')}")
@@ -120,8 +132,23 @@ def advance_sub_step(config_path="spacer.yaml"):
     return False, "All sub-steps are already complete.", cfg
 
 @click.command()
-def status_cmd():
+@click.option("--all", "all_projects", is_flag=True, help="Summarize every project in the workspace")
+def status_cmd(all_projects):
     """Show project status."""
+    if all_projects:
+        from .workspace import Store, find_workspace, format_summaries, project_summaries
+
+        root = find_workspace()
+        if root is None:
+            click.echo("Not inside a workspace. Run `spacer workspace init` first.")
+            raise SystemExit(1)
+        store = Store(root)
+        try:
+            click.echo(format_summaries(root, project_summaries(store)))
+        finally:
+            store.close()
+        return
+
     if not os.path.exists("spacer.yaml"):
         click.echo("No spacer.yaml found. Run `spacer init` first.")
         raise SystemExit(1)
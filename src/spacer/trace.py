@@ -0,0 +1,248 @@
+"""SPACER trace — lightweight spans around the hot paths.
+
+Set SPACER_TRACE to a file path to append one JSON line per span (name,
+start, duration, nesting, attributes); set it to 1 to write under
+.spacer/traces/. When SPACER_TRACE is unset, `span()` returns a shared
+no-op object, so instrumented code pays one global lookup per call.
+
+SPACER_TRACE_CAPTURE=cprofile additionally writes <trace>-<time>-<pid>.prof
+and records it as a `cprofile` event; SPACER_TRACE_CAPTURE=tracemalloc
+records the top allocation sites as `tracemalloc` events at exit.
+`spacer profile <trace>` summarizes a trace.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import click
+
+_ENV = os.environ.get("SPACER_TRACE", "").strip()
+_CAPTURE = os.environ.get("SPACER_TRACE_CAPTURE", "").strip().lower()
+_lock = threading.Lock()
+_local = threading.local()
+_file = None
+_path = None
+_STAMP = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+_EVENTS = ("tracemalloc", "cprofile")
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def _trace_path():
+    if _ENV in ("1", "true", "yes"):
+        from .cache import state_path
+        return state_path("traces", f"trace-{_STAMP}.jsonl")
+    return Path(_ENV)
+
+
+def _open():
+    """Open the trace file on first use. Call with `_lock` held."""
+    global _file, _path
+    if _file is None:
+        _path = _trace_path()
+        _path.parent.mkdir(parents=True, exist_ok=True)
+        _file = open(_path, "a", buffering=1)
+
+
+def _emit(record):
+    line = json.dumps(record, default=str) + "\n"
+    with _lock:
+        _open()
+        _file.write(line)
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "start", "t0", "parent")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1] if stack else None
+        stack.append(self.name)
+        self.start = time.time()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        dur = time.perf_counter() - self.t0
+        _local.stack.pop()
+        record = {
+            "name": self.name,
+            "start": self.start,
+            "dur": dur,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "parent": self.parent,
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        _emit(record)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+def span(name, **attrs):
+    """Time a block: `with span("http.s2", url=url) as s: ...; s.set(status=200)`."""
+    if not _ENV:
+        return _NOOP
+    return _Span(name, attrs)
+
+
+def traced(name):
+    """Decorator form of `span` for whole functions."""
+    def wrap(fn):
+        if not _ENV:
+            return fn
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with _Span(name, {}):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def start_capture():
+    """Start the optional cProfile / tracemalloc capture (called once by the CLI)."""
+    if not _ENV or not _CAPTURE:
+        return
+    with _lock:
+        _open()
+    if _CAPTURE == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        # Traces at an explicit path are appended to, so each run gets its own .prof.
+        name = f"{_path.stem}.prof" if _STAMP in _path.stem else f"{_path.stem}-{_STAMP}.prof"
+        prof = _path.resolve().with_name(name)
+
+        def dump():
+            profiler.disable()
+            profiler.dump_stats(str(prof))
+            _emit({"name": "cprofile", "start": time.time(), "dur": 0.0, "pid": os.getpid(),
+                   "attrs": {"path": str(prof)}})
+        atexit.register(dump)
+    elif _CAPTURE == "tracemalloc":
+        import tracemalloc
+        tracemalloc.start(10)
+
+        def dump():
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            top = [
+                {"site": str(stat.traceback[0]), "size": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:25]
+            ]
+            _emit({"name": "tracemalloc", "start": time.time(), "dur": 0.0, "pid": os.getpid(),
+                   "attrs": {"current": current, "peak": peak, "top": top}})
+        atexit.register(dump)
+
+
+def load_trace(path):
+    spans, events = [], []
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            (events if record.get("name") in _EVENTS else spans).append(record)
+    return spans, events
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def summarize(spans):
+    """Per-name latency stats, sorted by total time."""
+    by_name = {}
+    for s in spans:
+        by_name.setdefault(s["name"], []).append(s["dur"])
+    rows = []
+    for name, durs in by_name.items():
+        durs.sort()
+        rows.append({
+            "name": name,
+            "count": len(durs),
+            "total": sum(durs),
+            "p50": _percentile(durs, 0.50),
+            "p90": _percentile(durs, 0.90),
+            "p99": _percentile(durs, 0.99),
+            "max": durs[-1],
+        })
+    rows.sort(key=lambda r: r["total"], reverse=True)
+    return rows
+
+
+def format_summary(rows):
+    if not rows:
+        return "No spans recorded."
+    width = max(len("span"), max(len(r["name"]) for r in rows))
+    lines = [f"{'span':<{width}} {'count':>6} {'total':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}"]
+    for r in rows:
+        lines.append(
+            f"{r['name']:<{width}} {r['count']:>6} "
+            + " ".join(f"{r[k] * 1000:>7.1f}ms" for k in ("total", "p50", "p90", "p99", "max"))
+        )
+    return "\n".join(lines)
+
+
+@click.command("profile")
+@click.argument("trace", type=click.Path(exists=True))
+@click.option("--top", default=15, help="Rows of cProfile / tracemalloc detail to show")
+def profile_cmd(trace, top):
+    """Summarize a SPACER_TRACE file: latency percentiles per span."""
+    spans, events = load_trace(trace)
+    click.echo(format_summary(summarize(spans)))
+
+    for event in events:
+        attrs = event.get("attrs", {})
+        if event.get("name") == "cprofile":
+            prof = Path(attrs.get("path", ""))
+            if not prof.is_file():
+                click.echo(f"\ncProfile: {prof} is missing")
+                continue
+            import io
+            import pstats
+            out = io.StringIO()
+            pstats.Stats(str(prof), stream=out).sort_stats("cumulative").print_stats(top)
+            click.echo(f"\ncProfile ({prof}):")
+            click.echo(out.getvalue().strip())
+            continue
+        click.echo(f"\ntracemalloc: current {attrs.get('current', 0) / 1e6:.1f} MB, "
+                   f"peak {attrs.get('peak', 0) / 1e6:.1f} MB")
+        for item in attrs.get("top", [])[:top]:
+            click.echo(f"  {item['size'] / 1024:>9.1f} KiB  {item['count']:>7}  {item['site']}")
@@ -0,0 +1,463 @@
+"""SPACER workspace — several papers sharing one content-addressed store.
+
+A directory holding spacer-workspace.yaml is a workspace; every SPACER
+project below it (a directory with its own spacer.yaml) keeps its fetched
+paper metadata, mirrored literature, API response caches and results
+checkpoints in <workspace>/.spacer-store/store.db instead of its own
+.spacer/.
+
+Values are stored once, as zlib-compressed JSON keyed by the sha256 of
+their canonical encoding (`objects`). Each project sees the store through
+its own view: named references (`refs`: project, namespace, key → digest).
+Triggers keep a reference count on every object and delete it in the same
+transaction once the count reaches zero, so overwriting a mutable entry
+(a results checkpoint, a refreshed lookup) never leaves garbage behind.
+`spacer workspace gc` only has to drop the references of removed projects
+(and, optionally, old response caches).
+
+The `projects` table also caches a short summary of each project keyed on
+its spacer.yaml stat signature, so `spacer status --all` reads one row per
+project and only re-parses the configs that changed.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
+import click
+import yaml
+
+from .status import get_current_sub_step, load_spacer_config
+
+WORKSPACE_FILE = "spacer-workspace.yaml"
+STORE_DIR = ".spacer-store"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY, size INTEGER NOT NULL, refcount INTEGER NOT NULL DEFAULT 0,
+    data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS refs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT, project TEXT NOT NULL, ns TEXT NOT NULL,
+    key TEXT NOT NULL, digest TEXT NOT NULL, stamp REAL NOT NULL, UNIQUE (project, ns, key));
+CREATE INDEX IF NOT EXISTS refs_key ON refs (ns, key);
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY, sig TEXT, summary TEXT, added REAL NOT NULL);
+CREATE TRIGGER IF NOT EXISTS refs_insert AFTER INSERT ON refs BEGIN
+    UPDATE objects SET refcount = refcount + 1 WHERE digest = NEW.digest;
+END;
+CREATE TRIGGER IF NOT EXISTS refs_delete AFTER DELETE ON refs BEGIN
+    UPDATE objects SET refcount = refcount - 1 WHERE digest = OLD.digest;
+END;
+CREATE TRIGGER IF NOT EXISTS refs_update AFTER UPDATE OF digest ON refs
+WHEN OLD.digest != NEW.digest BEGIN
+    UPDATE objects SET refcount = refcount - 1 WHERE digest = OLD.digest;
+    UPDATE objects SET refcount = refcount + 1 WHERE digest = NEW.digest;
+END;
+CREATE TRIGGER IF NOT EXISTS objects_release AFTER UPDATE OF refcount ON objects
+WHEN NEW.refcount <= 0 BEGIN
+    DELETE FROM objects WHERE digest = NEW.digest;
+END;
+"""
+
+
+def find_workspace(start=None):
+    """Root of the workspace containing `start` (default: cwd), or None."""
+    env = os.environ.get("SPACER_WORKSPACE")
+    if env:
+        return Path(env).resolve()
+    here = Path(start or os.getcwd()).resolve()
+    for directory in (here, *here.parents):
+        if (directory / WORKSPACE_FILE).exists():
+            return directory
+    return None
+
+
+def _store_path(root):
+    cfg = {}
+    try:
+        with open(root / WORKSPACE_FILE) as f:
+            cfg = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        pass
+    return root / (cfg.get("store") if isinstance(cfg, dict) and cfg.get("store") else STORE_DIR) / "store.db"
+
+
+def _encode(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+
+
+class Store:
+    """The workspace's shared object store."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        path = _store_path(self.root)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def put_object(self, value):
+        """Store `value` once; returns its digest. Call inside a transaction with the ref."""
+        data = _encode(value)
+        digest = hashlib.sha256(data).hexdigest()
+        self.db.execute(
+            "INSERT OR IGNORE INTO objects (digest, size, data) VALUES (?, ?, ?)",
+            (digest, len(data), zlib.compress(data)),
+        )
+        return digest
+
+    def load_object(self, digest):
+        row = self.db.execute("SELECT data FROM objects WHERE digest = ?", (digest,)).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def register(self, name):
+        """Add `name` to the project list; a plain read when it is already there."""
+        if self.db.execute("SELECT 1 FROM projects WHERE name = ?", (name,)).fetchone():
+            return
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO projects (name, added) VALUES (?, ?)", (name, time.time())
+            )
+
+    def projects(self):
+        return [row[0] for row in self.db.execute("SELECT name FROM projects ORDER BY name")]
+
+    def stats(self):
+        objects, size, stored = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM objects"
+        ).fetchone()
+        refs = self.db.execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+        per_project = dict(self.db.execute("SELECT project, COUNT(*) FROM refs GROUP BY project"))
+        return {"objects": objects, "bytes": size, "stored": stored, "refs": refs, "projects": per_project}
+
+    def gc(self, older_than=None, dry_run=False):
+        """Drop refs of vanished projects (and lookups older than `older_than` s); the
+        triggers delete objects left unreferenced. Returns counts."""
+        gone = [p for p in self.projects() if not (self.root / p / "spacer.yaml").exists()]
+        totals = "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM objects"
+        dropped = 0
+        with self.db:
+            objects, size = self.db.execute(totals).fetchone()
+            for name in gone:
+                dropped += self.db.execute("DELETE FROM refs WHERE project = ?", (name,)).rowcount
+                self.db.execute("DELETE FROM projects WHERE name = ?", (name,))
+            if older_than is not None:
+                dropped += self.db.execute(
+                    "DELETE FROM refs WHERE ns LIKE 'lookup:%' AND stamp < ?", (time.time() - older_than,)
+                ).rowcount
+            # Orphans from stores created before objects were released eagerly.
+            self.db.execute("DELETE FROM objects WHERE refcount <= 0")
+            left, left_size = self.db.execute(totals).fetchone()
+            if dry_run:
+                self.db.rollback()
+        if objects != left and not dry_run:
+            self.db.execute("VACUUM")
+        return {"projects": gone, "refs": dropped, "objects": objects - left, "bytes": size - left_size}
+
+
+class ProjectView:
+    """One project's named references into the shared store.
+
+    `get` answers from any project's copy (the newest) and links it into
+    this view; `get_many`, `since` and `count` see only this project's refs.
+    """
+
+    def __init__(self, store, project):
+        self.store = store
+        self.db = store.db
+        self.project = project
+        self.source = f"workspace:{store.root}"
+        store.register(project)
+
+    def close(self):
+        self.store.close()
+
+    def get(self, ns, key, max_age=None):
+        row = self.db.execute(
+            "SELECT project, digest, stamp FROM refs WHERE ns = ? AND key = ? "
+            "ORDER BY stamp DESC LIMIT 1", (ns, key),
+        ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[2] > max_age):
+            return None
+        if row[0] != self.project:
+            with self.db:
+                self._link(ns, key, row[1], row[2])
+        return self.store.load_object(row[1])
+
+    def put(self, ns, key, value, stamp=None):
+        with self.db:
+            self._link(ns, key, self.store.put_object(value), stamp or time.time())
+
+    def _link(self, ns, key, digest, stamp):
+        self.db.execute(
+            "INSERT INTO refs (project, ns, key, digest, stamp) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (project, ns, key) DO UPDATE SET digest = excluded.digest, stamp = excluded.stamp",
+            (self.project, ns, key, digest, stamp),
+        )
+
+    def add(self, ns, items):
+        """Add (key, value) pairs this view does not have yet. Returns refs added."""
+        added, now = 0, time.time()
+        with self.db:
+            for key, value in items:
+                exists = self.db.execute(
+                    "SELECT 1 FROM refs WHERE project = ? AND ns = ? AND key = ?", (self.project, ns, key)
+                ).fetchone()
+                if exists is None:
+                    self._link(ns, key, self.store.put_object(value), now)
+                    added += 1
+        return added
+
+    def get_many(self, ns, keys):
+        out = {}
+        for i in range(0, len(keys), 500):
+            chunk = list(keys[i:i + 500])
+            marks = ",".join("?" * len(chunk))
+            rows = self.db.execute(
+                f"SELECT r.key, o.data FROM refs r JOIN objects o ON o.digest = r.digest "
+                f"WHERE r.project = ? AND r.ns = ? AND r.key IN ({marks})", [self.project, ns, *chunk],
+            )
+            for key, data in rows:
+                out[key] = json.loads(zlib.decompress(data))
+        return out
+
+    def since(self, ns, seq):
+        """(seq, key, value) of refs added to this view after `seq`, in order."""
+        rows = self.db.execute(
+            "SELECT r.seq, r.key, o.data FROM refs r JOIN objects o ON o.digest = r.digest "
+            "WHERE r.project = ? AND r.ns = ? AND r.seq > ? ORDER BY r.seq", (self.project, ns, seq),
+        )
+        return [(s, key, json.loads(zlib.decompress(data))) for s, key, data in rows]
+
+    def count(self, ns):
+        return self.db.execute(
+            "SELECT COUNT(*) FROM refs WHERE project = ? AND ns = ?", (self.project, ns)
+        ).fetchone()[0]
+
+
+def project_name(root, path=None):
+    return Path(path or os.getcwd()).resolve().relative_to(root).as_posix()
+
+
+def find_projects(root):
+    """Names of the projects (directories with a spacer.yaml) at any depth below `root`."""
+    names = []
+    for directory, subdirs, files in os.walk(root):
+        # Skip hidden directories: .spacer-store, .spacer, .git and the like.
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith("."))
+        if "spacer.yaml" in files and Path(directory) != Path(root):
+            names.append(project_name(root, directory))
+    return names
+
+
+def open_view():
+    """This project's view of its workspace store, or None outside a workspace."""
+    if not Path("spacer.yaml").exists():
+        return None
+    root = find_workspace()
+    if root is None:
+        return None
+    try:
+        name = project_name(root)
+    except ValueError:
+        return None
+    return ProjectView(Store(root), name)
+
+
+# ─── Workspace status ───
+
+def _summarize(cfg):
+    project = cfg.get("project") or {}
+    return {
+        "title": project.get("title") or "",
+        "phase": cfg.get("phase", "?"),
+        "phase_status": cfg.get("phase_status", "?"),
+        "sub_step": get_current_sub_step(cfg),
+    }
+
+
+def project_summaries(store):
+    """Cached summary per project; only configs whose stat changed are re-read."""
+    counts = {}
+    for project, ns, n, last in store.db.execute(
+        "SELECT project, ns, COUNT(*), MAX(stamp) FROM refs GROUP BY project, ns"
+    ):
+        entry = counts.setdefault(project, {"refs": 0, "papers": 0, "active": 0.0})
+        entry["refs"] += n
+        entry["active"] = max(entry["active"], last)
+        if ns == "paper":
+            entry["papers"] = n
+
+    out = []
+    rows = store.db.execute("SELECT name, sig, summary FROM projects ORDER BY name").fetchall()
+    for name, sig, summary in rows:
+        config = store.root / name / "spacer.yaml"
+        try:
+            st = config.stat()
+        except OSError:
+            out.append({"name": name, "missing": True})
+            continue
+        current = f"{st.st_size}:{st.st_mtime_ns}"
+        if current != sig or summary is None:
+            try:
+                data = _summarize(load_spacer_config(str(config)))
+            except (OSError, ValueError, yaml.YAMLError) as e:
+                data = {"error": str(e)}
+            summary = json.dumps(data)
+            with store.db:
+                store.db.execute(
+                    "UPDATE projects SET sig = ?, summary = ? WHERE name = ?", (current, summary, name)
+                )
+        out.append({"name": name, **json.loads(summary), **counts.get(name, {})})
+    return out
+
+
+def format_summaries(root, summaries):
+    lines = [f"Workspace: {root} ({len(summaries)} project(s))"]
+    if not summaries:
+        lines.append("  No projects yet. Add one with `spacer workspace add <dir>`.")
+    width = max([len(s["name"]) for s in summaries] + [7])
+    for s in summaries:
+        if s.get("missing"):
+            lines.append(f"  {s['name']:<{width}}  (spacer.yaml missing; `spacer workspace gc` drops it)")
+            continue
+        if s.get("error"):
+            lines.append(f"  {s['name']:<{width}}  (unreadable spacer.yaml: {s['error']})")
+            continue
+        step = s.get("sub_step")
+        phase = f"{s['phase']} ({s['phase_status']})" + (f", {step.replace('_', ' ')}" if step else "")
+        active = (time.strftime("%Y-%m-%d", time.localtime(s["active"])) if s.get("active") else "—")
+        lines.append(f"  {s['name']:<{width}}  {phase:<44} papers {s.get('papers', 0):>5}  active {active}")
+        if s.get("title"):
+            lines.append(f"  {'':<{width}}  {s['title']}")
+    return "\n".join(lines)
+
+
+def _human(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+# ─── Commands ───
+
+def _require_workspace():
+    root = find_workspace()
+    if root is None:
+        click.echo(f"No {WORKSPACE_FILE} found here or above. Run `spacer workspace init` first.")
+        raise SystemExit(1)
+    return root
+
+
+@click.group("workspace")
+def workspace_group():
+    """Share bib, literature and results caches between several papers."""
+    pass
+
+
+@workspace_group.command("init")
+@click.argument("directory", default=".", type=click.Path(file_okay=False))
+def init_ws(directory):
+    """Make DIRECTORY (default: here) a workspace."""
+    root = Path(directory).resolve()
+    root.mkdir(parents=True, exist_ok=True)
+    marker = root / WORKSPACE_FILE
+    if not marker.exists():
+        marker.write_text(f"# SPACER workspace: projects below share {STORE_DIR}/\nstore: {STORE_DIR}\n")
+    store = Store(root)
+    try:
+        for name in find_projects(root):
+            store.register(name)
+        names = store.projects()
+    finally:
+        store.close()
+    click.echo(f"✓ Workspace at {root} ({len(names)} project(s))")
+
+
+@workspace_group.command("add")
+@click.argument("projects", nargs=-1, required=True, type=click.Path(exists=True, file_okay=False))
+def add_ws(projects):
+    """Register projects and move their local caches into the shared store.
+
+    The project's .spacer/papers.db and results checkpoints are deleted once
+    they have been copied, so no stale local copy is left behind.
+    """
+    from .related import PaperStore, WorkspacePaperStore
+
+    root = _require_workspace()
+    for directory in projects:
+        path = Path(directory).resolve()
+        if not (path / "spacer.yaml").exists():
+            click.echo(f"✗ {directory}: no spacer.yaml")
+            continue
+        try:
+            name = project_name(root, path)
+        except ValueError:
+            click.echo(f"✗ {directory}: not inside {root}")
+            continue
+        view = ProjectView(Store(root), name)
+        papers = lookups = checkpoints = 0
+        try:
+            local = path / ".spacer" / "papers.db"
+            if local.exists():
+                source = PaperStore(local)
+                try:
+                    papers, lookups = WorkspacePaperStore(view).absorb(source)
+                finally:
+                    source.close()
+                for leftover in (local, local.with_name("papers.db-journal")):
+                    if leftover.exists():
+                        leftover.unlink()
+            for ckpt in sorted((path / ".spacer" / "results").glob("*.json")):
+                try:
+                    view.put("results", ckpt.stem, json.loads(ckpt.read_text()))
+                except (OSError, ValueError):
+                    continue
+                ckpt.unlink()
+                checkpoints += 1
+        finally:
+            view.close()
+        click.echo(f"✓ {name}: {papers} paper(s), {lookups} cached lookup(s), {checkpoints} results checkpoint(s)")
+
+
+@workspace_group.command("gc")
+@click.option("--older-than", type=float, default=None, help="Also drop API response caches older than N days")
+@click.option("--dry-run", is_flag=True, help="Report what would be freed")
+def gc_ws(older_than, dry_run):
+    """Drop removed projects' references and delete unreferenced objects."""
+    store = Store(_require_workspace())
+    try:
+        result = store.gc(older_than * 86400 if older_than is not None else None, dry_run)
+    finally:
+        store.close()
+    verb = "Would free" if dry_run else "Freed"
+    for name in result["projects"]:
+        click.echo(f"  - {name} (no spacer.yaml)")
+    click.echo(f"{verb} {result['objects']} object(s), {_human(result['bytes'])}; "
+               f"{result['refs']} reference(s) dropped.")
+
+
+@workspace_group.command("info")
+def info_ws():
+    """Store size, deduplication and per-project references."""
+    root = _require_workspace()
+    store = Store(root)
+    try:
+        s = store.stats()
+    finally:
+        store.close()
+    ratio = s["refs"] / s["objects"] if s["objects"] else 0.0
+    click.echo(f"Store: {_store_path(root)}")
+    click.echo(f"  {s['objects']} object(s), {_human(s['bytes'])} ({_human(s['stored'])} compressed)")
+    click.echo(f"  {s['refs']} reference(s), {ratio:.2f} per object")
+    for name, n in sorted(s["projects"].items()):
+        click.echo(f"  {name}: {n} reference(s)")